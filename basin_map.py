@@ -0,0 +1,180 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_simulator import MAX_ATTACK_TENSOR_SIZE, count_safe_pairs, neighbor_safe_pairs
+from parallel_trials import shard_ranges
+from queens_evaluator import pack_board, unpack_board
+
+# Each table entry packs the terminal board index, the step count and a
+# solved flag into one uint32.
+TERMINAL_BITS = 24
+STEPS_BITS = 7
+STEPS_SHIFT = TERMINAL_BITS
+SOLVED_SHIFT = TERMINAL_BITS + STEPS_BITS
+TERMINAL_MASK = (1 << TERMINAL_BITS) - 1
+STEPS_MASK = (1 << STEPS_BITS) - 1
+# Boards per worker task while computing successors.
+BUILD_CHUNK_SIZE = 1 << 18
+
+
+def unpack_boards(indices, n=8):
+    """Vectorized `unpack_board` for an array of packed boards."""
+    powers = n ** np.arange(n, dtype=np.int64)
+    return (np.asarray(indices, dtype=np.int64)[:, None] // powers) % n
+
+
+def _successor_chunk(start, stop, n):
+    """Steepest-ascent successor and safe pairs for boards [start, stop).
+
+    A board that no move improves is its own successor.
+    """
+    indices = np.arange(start, stop, dtype=np.int64)
+    successors = indices.copy()
+    safe_pairs = np.empty(stop - start, dtype=np.int64)
+    sub_chunk = max(1, MAX_ATTACK_TENSOR_SIZE // n ** 3)
+    powers = n ** np.arange(n, dtype=np.int64)
+
+    for offset in range(0, stop - start, sub_chunk):
+        part = slice(offset, offset + sub_chunk)
+        boards = unpack_boards(indices[part], n)
+        current = count_safe_pairs(boards)
+        scores = neighbor_safe_pairs(boards).reshape(boards.shape[0], n * n)
+        best = scores.argmax(axis=1)
+        improving = scores[np.arange(boards.shape[0]), best] > current
+        cols, rows = np.divmod(best[improving], n)
+        moved = indices[part][improving]
+        old_rows = boards[improving, cols]
+        successors[part][improving] = moved + (rows - old_rows) * powers[cols]
+        safe_pairs[part] = current
+    return start, successors, safe_pairs
+
+
+def build_basin_map(path, n=8, workers=None):
+    """Run steepest ascent from every one of the n**n start boards and save the results.
+
+    Every board's single-step successor is computed once (in parallel across
+    `workers` processes); terminal boards and step counts then follow by
+    pointer jumping along the successor links, so no climb is repeated. The
+    table is written to `path` as a .npy file of packed uint32 records that
+    `load_basin_map` memory-maps.
+
+    Results match `perform_hill_climb`, whose first-best tie-breaking is not
+    invariant under board reflections, so every board is computed rather
+    than one per symmetry class.
+    """
+    num_boards = n ** n
+    if num_boards > 1 << TERMINAL_BITS:
+        raise ValueError(f"Basin maps hold at most {1 << TERMINAL_BITS} boards; n={n} has {num_boards}")
+
+    successors = np.empty(num_boards, dtype=np.int64)
+    safe_pairs = np.empty(num_boards, dtype=np.int64)
+    ranges = shard_ranges(num_boards, -(-num_boards // BUILD_CHUNK_SIZE))
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(_successor_chunk, *zip(*ranges), [n] * len(ranges))
+            for start, chunk_successors, chunk_pairs in chunks:
+                successors[start:start + chunk_successors.size] = chunk_successors
+                safe_pairs[start:start + chunk_pairs.size] = chunk_pairs
+    else:
+        for start, stop in ranges:
+            _, successors[start:stop], safe_pairs[start:stop] = _successor_chunk(start, stop, n)
+
+    # Pointer jumping: follow successor links until every board points at
+    # its terminal board, counting the moves made along the way.
+    terminal = successors.copy()
+    moves = (successors != np.arange(num_boards)).astype(np.int64)
+    while True:
+        next_terminal = terminal[terminal]
+        if np.array_equal(next_terminal, terminal):
+            break
+        moves += moves[terminal]
+        terminal = next_terminal
+
+    # perform_hill_climb also counts the final step that finds no improvement
+    steps = moves + 1
+    if steps.max() > STEPS_MASK:
+        raise ValueError(f"Step counts up to {steps.max()} do not fit in {STEPS_BITS} bits")
+    solved = safe_pairs[terminal] == n * (n - 1) // 2
+
+    table = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint32, shape=(num_boards,))
+    table[:] = (terminal.astype(np.uint32)
+                | (steps.astype(np.uint32) << STEPS_SHIFT)
+                | (solved.astype(np.uint32) << SOLVED_SHIFT))
+    table.flush()
+    return load_basin_map(path)
+
+
+def load_basin_map(path):
+    """Memory-map a table written by `build_basin_map`."""
+    return np.load(path, mmap_mode='r')
+
+
+def basin_map_size(table):
+    """Board size n of a basin map table."""
+    num_boards = table.shape[0]
+    n = 1
+    while n ** n < num_boards:
+        n += 1
+    return n
+
+
+def decode_entries(records):
+    """Split packed records into (terminal_indices, steps, solved) arrays."""
+    records = np.asarray(records, dtype=np.uint32)
+    return (records & TERMINAL_MASK,
+            (records >> STEPS_SHIFT) & STEPS_MASK,
+            (records >> SOLVED_SHIFT).astype(bool))
+
+
+def lookup_board(table, board):
+    """Return (final_board, steps_taken, solved) of steepest ascent from `board`."""
+    record = int(table[pack_board(board)])
+    return (unpack_board(record & TERMINAL_MASK, len(board)),
+            (record >> STEPS_SHIFT) & STEPS_MASK,
+            bool(record >> SOLVED_SHIFT))
+
+
+def steps_histogram(table):
+    """Count start boards by step count, split into (solved, stuck) arrays."""
+    _, steps, solved = decode_entries(table)
+    length = STEPS_MASK + 1
+    return (np.bincount(steps[solved], minlength=length),
+            np.bincount(steps[~solved], minlength=length))
+
+
+def exact_hill_climbing_results(table):
+    """Exact counterpart of `simulate_hill_climbing` over every start board.
+
+    Returns the same tuple: (success_rate, avg_steps_to_success,
+    avg_steps_to_stuck, optimal_solution, max_safe_pairs, fewest_steps).
+    The reported solution is the one reached in the fewest steps, taking the
+    lowest start index on ties.
+    """
+    n = basin_map_size(table)
+    terminal, steps, solved = decode_entries(table)
+    successes = int(solved.sum())
+    stuck = solved.size - successes
+
+    success_rate = successes / solved.size
+    avg_steps_to_success = float(steps[solved].mean()) if successes > 0 else 0
+    avg_steps_to_stuck = float(steps[~solved].mean()) if stuck > 0 else 0
+
+    if successes > 0:
+        candidates = np.flatnonzero(solved)
+    else:
+        final_pairs = count_safe_pairs(unpack_boards(terminal, n))
+        candidates = np.flatnonzero(final_pairs == final_pairs.max())
+    best = candidates[np.argmin(steps[candidates])]
+    optimal_solution = unpack_board(int(terminal[best]), n)
+    max_safe_pairs = int(count_safe_pairs(np.array([optimal_solution]))[0])
+    return (success_rate, avg_steps_to_success, avg_steps_to_stuck,
+            optimal_solution, max_safe_pairs, int(steps[best]))
+
+
+def build_or_load_basin_map(path, n=8, workers=None):
+    """Load the basin map at `path`, building it first if it does not exist."""
+    if os.path.exists(path):
+        return load_basin_map(path)
+    return build_basin_map(path, n, workers)
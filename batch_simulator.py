@@ -0,0 +1,181 @@
+import numpy as np
+
+# Upper bound on elements in the (boards, columns, rows, queens) attack
+# tensor built per chunk, to keep steepest-ascent memory bounded.
+MAX_ATTACK_TENSOR_SIZE = 1 << 24
+
+
+def random_boards(num_boards, n=8, rng=None):
+    """Generate a (num_boards, n) array of random boards, one queen per column."""
+    rng = np.random.default_rng() if rng is None else rng
+    return rng.integers(0, n, size=(num_boards, n), dtype=np.int64)
+
+
+def count_safe_pairs(boards):
+    """Count non-attacking queen pairs for every board in a (B, n) array."""
+    n = boards.shape[1]
+    i, j = np.triu_indices(n, k=1)
+    rows_i = boards[:, i]
+    rows_j = boards[:, j]
+    attacking = (rows_i == rows_j) | (np.abs(rows_i - rows_j) == (j - i))
+    return n * (n - 1) // 2 - attacking.sum(axis=1)
+
+
+def square_attacks(boards):
+    """Return a (B, n, n) array of attacks on each square from other columns.
+
+    Entry [b, col, row] counts the queens of board b, outside `col`, that
+    would attack a queen placed at (row, col).
+    """
+    n = boards.shape[1]
+    cols = np.arange(n)
+    queen_rows = boards[:, None, None, :]
+    rows = cols[None, None, :, None]
+    distance = np.abs(cols[None, :] - cols[:, None])[None, :, None, :]
+    attacks = (queen_rows == rows) | (np.abs(queen_rows - rows) == distance)
+    attacks &= (cols[:, None] != cols[None, :])[None, :, None, :]
+    return attacks.sum(axis=3)
+
+
+def neighbor_safe_pairs(boards):
+    """Score every single-queen move of every board.
+
+    Returns a (B, n, n) array where [b, col, row] is the number of
+    non-attacking pairs after moving board b's queen in `col` to `row`.
+    Moves that keep a queen where it is score -1 so they are never chosen.
+    """
+    num_boards, n = boards.shape
+    attacks = square_attacks(boards)
+    board_index = np.arange(num_boards)[:, None]
+    current = attacks[board_index, np.arange(n)[None, :], boards]
+    attacking_pairs = current.sum(axis=1) // 2
+    scores = (n * (n - 1) // 2 - attacking_pairs)[:, None, None] + current[:, :, None] - attacks
+    scores[board_index, np.arange(n)[None, :], boards] = -1
+    return scores
+
+
+def climb_boards(boards):
+    """Run steepest-ascent hill climbing on every board in lockstep.
+
+    Follows `perform_hill_climb` exactly, including picking the first best
+    move in column/row order, so each board ends where the scalar climber
+    would. Boards retire as soon as no move improves them. Returns
+    (final_boards, final_safe_pairs, steps_taken).
+    """
+    boards = np.array(boards, dtype=np.int64)
+    num_boards, n = boards.shape
+    safe_pairs = count_safe_pairs(boards)
+    steps = np.zeros(num_boards, dtype=np.int64)
+    active = np.arange(num_boards)
+    chunk = max(1, MAX_ATTACK_TENSOR_SIZE // n ** 3)
+
+    while active.size:
+        steps[active] += 1
+        still_active = []
+        for start in range(0, active.size, chunk):
+            indices = active[start:start + chunk]
+            scores = neighbor_safe_pairs(boards[indices]).reshape(indices.size, n * n)
+            best = scores.argmax(axis=1)
+            best_pairs = scores[np.arange(indices.size), best]
+            improving = best_pairs > safe_pairs[indices]
+            moved = indices[improving]
+            cols, rows = np.divmod(best[improving], n)
+            boards[moved, cols] = rows
+            safe_pairs[moved] = best_pairs[improving]
+            still_active.append(moved)
+        active = np.concatenate(still_active)
+
+    return boards, safe_pairs, steps
+
+
+def simulate_hill_climbing_batch(num_trials, n=8, rng=None):
+    """Vectorized `simulate_hill_climbing`: same statistics, all trials at once."""
+    rng = np.random.default_rng() if rng is None else rng
+    final_boards, final_safe_pairs, steps_taken = climb_boards(random_boards(num_trials, n, rng))
+
+    solved = final_safe_pairs == n * (n - 1) // 2
+    successful_runs = int(solved.sum())
+    stuck_runs = num_trials - successful_runs
+    success_rate = successful_runs / num_trials
+    avg_steps_to_success = steps_taken[solved].mean() if successful_runs > 0 else 0
+    avg_steps_to_stuck = steps_taken[~solved].mean() if stuck_runs > 0 else 0
+
+    # Best solution: most safe pairs, then fewest steps, then earliest trial
+    best = np.lexsort((np.arange(num_trials), steps_taken, -final_safe_pairs))[0]
+    return (success_rate, float(avg_steps_to_success), float(avg_steps_to_stuck),
+            final_boards[best].tolist(), int(final_safe_pairs[best]), int(steps_taken[best]))
+
+
+def _move_attacks(boards, cols, rows):
+    """Attacks on (rows[b], cols[b]) from the other queens of each board."""
+    n = boards.shape[1]
+    distance = np.abs(np.arange(n)[None, :] - cols[:, None])
+    attacks = (boards == rows[:, None]) | (np.abs(boards - rows[:, None]) == distance)
+    attacks[np.arange(boards.shape[0]), cols] = False
+    return attacks.sum(axis=1)
+
+
+def walk_boards(boards, max_no_improvement_steps, sideways_limit, rng=None):
+    """Run `random_walk_hill_climb` on every board in lockstep.
+
+    Each step moves one random queen of every active board to a random
+    different row and rescores it from the two affected squares. Boards
+    retire when solved or when the step or sideways limit is reached.
+    Returns (final_boards, final_safe_pairs, steps, sideways_steps).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    boards = np.array(boards, dtype=np.int64)
+    num_boards, n = boards.shape
+    max_pairs = n * (n - 1) // 2
+    safe_pairs = count_safe_pairs(boards)
+    steps = np.zeros(num_boards, dtype=np.int64)
+    sideways = np.zeros(num_boards, dtype=np.int64)
+    active = np.arange(num_boards) if max_no_improvement_steps > 0 else np.arange(0)
+
+    while active.size:
+        current = boards[active]
+        cols = rng.integers(0, n, size=active.size)
+        old_rows = current[np.arange(active.size), cols]
+        rows = rng.integers(0, n - 1, size=active.size)
+        rows += rows >= old_rows
+
+        released = _move_attacks(current, cols, old_rows)
+        gained = _move_attacks(current, cols, rows)
+        boards[active, cols] = rows
+        safe_pairs[active] += released - gained
+        steps[active] += 1
+
+        unsolved = safe_pairs[active] != max_pairs
+        sideways[active[unsolved]] += 1
+        keep = (unsolved & (sideways[active] < sideways_limit)
+                & (steps[active] < max_no_improvement_steps))
+        active = active[keep]
+
+    return boards, safe_pairs, steps, sideways
+
+
+def simulate_random_walk_batch(num_trials, max_no_improvement_steps, sideways_limit, n=8, rng=None):
+    """Vectorized `simulate_random_walk`: same result list, all trials at once."""
+    rng = np.random.default_rng() if rng is None else rng
+    _, final_safe_pairs, steps, sideways = walk_boards(
+        random_boards(num_trials, n, rng), max_no_improvement_steps, sideways_limit, rng
+    )
+
+    solved = final_safe_pairs == n * (n - 1) // 2
+    successes = int(solved.sum())
+    stuck_cases = num_trials - successes
+
+    success_rate = (successes / num_trials) * 100
+    stuck_rate = (stuck_cases / num_trials) * 100
+
+    avg_success_steps = float(steps[solved].mean()) if successes > 0 else 0
+    avg_stuck_steps = float(steps[~solved].mean()) if stuck_cases > 0 else 0
+
+    avg_success_sideways = float(sideways[solved].mean()) if successes > 0 else 0
+    avg_stuck_sideways = float(sideways[~solved].mean()) if stuck_cases > 0 else 0
+
+    return [
+        success_rate, stuck_rate,
+        avg_success_steps, avg_stuck_steps,
+        avg_success_sideways, avg_stuck_sideways
+    ]
@@ -0,0 +1,185 @@
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import kernels
+from hill_climb_random_restart import random_walk_hill_climb as full_neighborhood_walk
+from n_queens_hill_climbing import perform_hill_climb
+from parallel_trials import trial_rng
+from random_restart_hill_climbing_fixed_steps import random_walk_climb
+from random_walk_hill_climbing import random_walk_hill_climb as single_neighbor_walk
+from safe_queen_pairs import hill_climbing_with_random_walk
+
+# Fixed seeds so every run benchmarks the same boards and trajectories.
+CORPUS_SEED = 20240501
+TRIAL_SEED = 7
+# Fraction by which a throughput may drop (or peak memory grow) before it
+# is reported as a regression against the baseline.
+REGRESSION_THRESHOLD = 0.10
+
+
+def _steepest_ascent(board, rng):
+    """Run `perform_hill_climb`; returns (steps, neighbor evaluations)."""
+    n = len(board)
+    _, _, steps = perform_hill_climb(board)
+    return steps, steps * n * (n - 1)
+
+
+def _full_neighborhood_walk(board, rng):
+    _, _, steps, _, _, _ = full_neighborhood_walk(board, 750, rng)
+    return steps, steps
+
+
+def _random_walk_climb(board, rng):
+    _, _, steps, _, _, _ = random_walk_climb(board, 750, rng)
+    return steps, steps
+
+
+def _hill_climbing_with_random_walk(board, rng):
+    _, _, steps, _ = hill_climbing_with_random_walk(board, 1000, rng)
+    return steps, steps
+
+
+def _single_neighbor_walk(board, rng):
+    _, _, steps, _ = single_neighbor_walk(board, 200, 100, rng=rng)
+    return steps, steps
+
+
+# name -> (runner, number of boards in the corpus). The unbounded walks run
+# until solved, about 0.2 s a board at n=8, so they get fewer boards, but
+# enough that a run lasts seconds and timing noise stays well below the
+# regression threshold.
+ALGORITHMS = {
+    'perform_hill_climb': (_steepest_ascent, 2000),
+    'random_walk_hill_climb': (_full_neighborhood_walk, 20),
+    'random_walk_climb': (_random_walk_climb, 20),
+    'hill_climbing_with_random_walk': (_hill_climbing_with_random_walk, 2000),
+    'random_board_neighbor_walk': (_single_neighbor_walk, 2000),
+}
+
+
+def board_corpus(n, size, seed=CORPUS_SEED):
+    """Fixed list of random start boards for a board size."""
+    rng = random.Random(f"{seed}:{n}")
+    return [[rng.randrange(n) for _ in range(n)] for _ in range(size)]
+
+
+def _run_corpus(runner, boards, seed):
+    steps = 0
+    evaluations = 0
+    for index, board in enumerate(boards):
+        # The block-drawn streams the drivers give their trials
+        board_steps, board_evaluations = runner(list(board), trial_rng(seed, index))
+        steps += board_steps
+        evaluations += board_evaluations
+    return steps, evaluations
+
+
+def benchmark(algorithm, n=8, repeat=3, seed=TRIAL_SEED):
+    """Benchmark one algorithm on its fixed corpus for board size n.
+
+    Timings are the best of `repeat` runs; peak memory comes from a separate
+    traced run because tracing slows the climbers down.
+    """
+    runner, corpus_size = ALGORITHMS[algorithm]
+    boards = board_corpus(n, corpus_size)
+
+    best_seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        steps, evaluations = _run_corpus(runner, boards, seed)
+        best_seconds = min(best_seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    _run_corpus(runner, boards, seed)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'trials': len(boards),
+        'steps': steps,
+        'evaluations': evaluations,
+        'seconds': best_seconds,
+        'trials_per_sec': len(boards) / best_seconds,
+        'steps_per_sec': steps / best_seconds,
+        'evaluations_per_sec': evaluations / best_seconds,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def run_suite(algorithms=None, sizes=(8,), repeat=3):
+    """Benchmark every algorithm and size; keys are '<algorithm>/n=<n>'."""
+    results = {}
+    for algorithm in algorithms or ALGORITHMS:
+        for n in sizes:
+            results[f"{algorithm}/n={n}"] = benchmark(algorithm, n, repeat)
+    return results
+
+
+def find_regressions(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """List human-readable regressions of `results` against `baseline`."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if result['steps'] != reference['steps']:
+            regressions.append(f"{key}: steps changed from {reference['steps']} to {result['steps']}")
+        for metric in ('trials_per_sec', 'steps_per_sec', 'evaluations_per_sec'):
+            if result[metric] < reference[metric] * (1 - threshold):
+                change = result[metric] / reference[metric] - 1
+                regressions.append(f"{key}: {metric} {change:+.1%}")
+        if result['peak_memory_bytes'] > reference['peak_memory_bytes'] * (1 + threshold):
+            change = result['peak_memory_bytes'] / reference['peak_memory_bytes'] - 1
+            regressions.append(f"{key}: peak_memory_bytes {change:+.1%}")
+    return regressions
+
+
+def format_results(results):
+    lines = [f"{'Benchmark':<44}{'Trials/s':>12}{'Steps/s':>14}{'Evals/s':>14}{'Peak KiB':>10}"]
+    for key, result in results.items():
+        lines.append(f"{key:<44}{result['trials_per_sec']:>12.1f}{result['steps_per_sec']:>14.0f}"
+                     f"{result['evaluations_per_sec']:>14.0f}{result['peak_memory_bytes'] / 1024:>10.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the n-queens climbers on fixed board corpora.")
+    parser.add_argument('--algorithm', action='append', choices=sorted(ALGORITHMS),
+                        help="algorithm to run (repeatable; default: all)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8], help="board sizes (default: 8)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per benchmark, best is kept")
+    parser.add_argument('--save-baseline', metavar='PATH', help="write results as a JSON baseline")
+    parser.add_argument('--baseline', metavar='PATH', help="compare against a JSON baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed relative slowdown before flagging a regression")
+    parser.add_argument('--kernels', choices=kernels.BACKENDS,
+                        help="kernel backend (default: numba when installed)")
+    args = parser.parse_args(argv)
+    if args.kernels:
+        kernels.set_backend(args.kernels)
+
+    results = run_suite(args.algorithm, args.sizes, args.repeat)
+    print(format_results(results))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Checkpoint and resume for long trial campaigns.
+
+`run_checkpointed` runs trials in fixed-size chunks through
+`parallel_trials.run_trial_range` and, after each chunk, atomically writes
+the merged counters, the number of completed trials and the master seed to
+a gzipped pickle. Every trial draws from `trial_rng(seed, trial)`, so the
+seed and the trial index are the whole random state: a resumed run repeats
+no trial, skips none, and merges chunks at the same boundaries as an
+uninterrupted run, so the final counters are the same. They match a run
+without checkpoints too, means and variances included, since those come
+from exact sums. Wall-clock totals and time-limited trials vary, as they
+do in any rerun.
+
+Only load checkpoints you wrote yourself; they are pickles.
+"""
+import gzip
+import os
+import pickle
+import random
+
+from parallel_trials import merge_counters, run_trial_range
+
+# Trials per checkpoint for each worker process.
+CHECKPOINT_TRIALS = 25
+CHECKPOINT_VERSION = 3
+
+
+def save_checkpoint(path, state):
+    """Write `state` to `path` atomically, so a crash leaves the old file intact."""
+    temporary_path = f"{path}.tmp"
+    with gzip.open(temporary_path, 'wb') as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path):
+    with gzip.open(path, 'rb') as file:
+        state = pickle.load(file)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a checkpoint this version can resume")
+    return state
+
+
+def run_checkpointed(trial_fn, num_trials, path, workers=1, seed=None, *args, params=(), resume=False,
+                     checkpoint_every=None, token=None):
+    """`run_trials` with a checkpoint written to `path` after every chunk.
+
+    `params` holds the plain values that define the run (limits, board
+    size); together with `trial_fn`, `num_trials` and the chunk size they
+    must match when resuming. With `resume=True` an existing checkpoint is
+    continued, and a finished one returns its counters at once; without it
+    an existing file is an error rather than being overwritten. Chunks hold
+    `checkpoint_every` trials, by default `CHECKPOINT_TRIALS` per worker.
+
+    A chunk cut short by cancelling `token` is not saved, so resuming reruns
+    it in full.
+    """
+    run = (f"{trial_fn.__module__}.{trial_fn.__qualname__}", num_trials, tuple(params))
+    if os.path.exists(path):
+        if not resume:
+            raise FileExistsError(f"{path} exists; pass resume=True to continue it")
+        state = load_checkpoint(path)
+        if state['run'] != run or seed is not None and seed != state['seed']:
+            raise ValueError(f"{path} was written for a different run: {state['run']}, seed {state['seed']}")
+    else:
+        if seed is None:
+            seed = random.getrandbits(64)
+        chunk = checkpoint_every or CHECKPOINT_TRIALS * max(1, workers or 1)
+        state = {'version': CHECKPOINT_VERSION, 'run': run, 'seed': seed, 'chunk': chunk, 'done': 0,
+                 'counters': None}
+
+    while state['done'] < num_trials:
+        start = state['done']
+        stop = min(start + state['chunk'], num_trials)
+        batch = run_trial_range(trial_fn, start, stop, workers, state['seed'], *args)
+        counters = batch if state['counters'] is None else merge_counters([state['counters'], batch])
+        if token is not None and token.cancelled:
+            return counters
+        state['counters'] = counters
+        state['done'] = stop
+        save_checkpoint(path, state)
+    return state['counters']
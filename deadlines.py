@@ -0,0 +1,85 @@
+import threading
+import time
+
+# Work, in neighbor evaluations, between reads of the clock and the
+# cancellation token; one evaluation is cheaper than reading either.
+CHECK_INTERVAL = 256
+
+
+class CancellationToken:
+    """Flag that asks running climbers to stop at their next deadline check.
+
+    Wraps a `threading.Event` by default. Pass a `multiprocessing` event
+    (for example from `multiprocessing.Manager().Event()`) to cancel climbers
+    running in other processes.
+    """
+
+    def __init__(self, event=None):
+        self.event = threading.Event() if event is None else event
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+
+class Deadline:
+    """Cooperative step, wall-clock and cancellation budget for the climbers.
+
+    Climbers call `expired(steps, cost)` once per step, where `cost` is the
+    number of neighbors the step evaluated (one for the walks, the whole
+    neighborhood for a steepest-ascent step). The step budget is compared on
+    every call; the clock and the token are only read once the steps have
+    evaluated `check_interval` neighbors, so a climb overruns its time budget
+    by at most that much work. Once time runs out or the token is cancelled the deadline
+    stays expired, so one deadline can bound a whole series of restarts.
+    `reason` records what expired: 'steps', 'time' or 'cancelled'.
+    """
+
+    def __init__(self, seconds=None, max_steps=None, token=None, check_interval=CHECK_INTERVAL):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self.max_steps = max_steps
+        self.token = token
+        self.check_interval = check_interval
+        self.reason = None
+        self._countdown = check_interval
+
+    def expired(self, steps=0, cost=1):
+        if self.max_steps is not None and steps >= self.max_steps:
+            self.reason = 'steps'
+            return True
+        self._countdown -= cost
+        if self._countdown > 0:
+            return False
+        if self.check():
+            # Leave the countdown spent so every later call reports expiry.
+            self._countdown = 0
+            return True
+        self._countdown = self.check_interval
+        return False
+
+    def restart(self, max_steps=None):
+        """Give the next walk a fresh step budget, keeping the clock and token."""
+        self.max_steps = max_steps
+        if self.reason == 'steps':
+            self.reason = None
+
+    def check(self):
+        """Read the clock and token now; True if time is up or cancelled."""
+        if self.reason in ('time', 'cancelled'):
+            return True
+        if self.token is not None and self.token.cancelled:
+            self.reason = 'cancelled'
+            return True
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            self.reason = 'time'
+            return True
+        return False
+
+    def remaining(self):
+        """Seconds left on the clock, or None without a time budget."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
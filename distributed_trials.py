@@ -0,0 +1,277 @@
+"""Run trials on workers spread over several machines.
+
+A Coordinator listens on a TCP port and hands out leases on fixed ranges
+of trials, together with the master seed, to the workers that connect to
+it. Each worker runs its range with the same trial function `run_trials`
+uses and sends back the counters, and the coordinator merges them in range
+order. Every trial draws from `trial_rng(seed, trial)` and ranges are
+merged at fixed boundaries, so a seeded run gives the same counters no
+matter how many workers join, which of them runs what, or whether some
+die along the way. The counters match `run_trials` exactly, apart from
+wall-clock times; `RunningStats` means and variances are derived from
+exact sums, so they do not depend on the chunk boundaries either.
+
+    # on the coordinator
+    coordinator = Coordinator(('0.0.0.0', 8766), authkey=b'secret')
+    results = random_restart_hill_climb_fixed_steps(10**6, 750, 500, seed=1, distributed=coordinator)
+
+    # on every worker machine, any number of times
+    python distributed_trials.py --connect coordinator-host:8766 --authkey secret
+
+A range whose worker disconnects goes back in the queue at once, and one
+held longer than `lease_timeout` is handed to the next idle worker as well;
+whichever copy finishes first is used. Connections are authenticated with
+`authkey`, but messages are pickles: only run this on a trusted network.
+"""
+import argparse
+import random
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from multiprocessing import AuthenticationError, Process
+from multiprocessing.connection import Client, Listener
+
+from parallel_trials import merge_counters
+
+DEFAULT_PORT = 8766
+DEFAULT_AUTHKEY = b'n-queens'
+# Trials per lease. Smaller leases lose less work to a dead worker and
+# balance better; larger ones spend less time on messages.
+CHUNK_TRIALS = 50
+# Seconds a lease may run before it is also handed to another worker.
+LEASE_TIMEOUT = 600
+# Seconds an idle worker waits before asking again while the last leases
+# are still running elsewhere.
+POLL_INTERVAL = 0.5
+# How long a worker keeps trying to reach a coordinator that is not up yet.
+CONNECT_TIMEOUT = 30
+CONNECT_RETRY = 0.2
+
+
+class Coordinator:
+    """Hands out trial ranges to workers over TCP and merges their counters.
+
+    `local_workers` starts that many worker processes on this machine for
+    each run, which is enough to try the protocol without a cluster. Use
+    port 0 to listen on any free port; `address` then holds the one chosen.
+    """
+
+    def __init__(self, address=('127.0.0.1', DEFAULT_PORT), authkey=DEFAULT_AUTHKEY, local_workers=0,
+                 chunk_trials=CHUNK_TRIALS, lease_timeout=LEASE_TIMEOUT):
+        self.address = tuple(address)
+        self.authkey = authkey
+        self.local_workers = local_workers
+        self.chunk_trials = chunk_trials
+        self.lease_timeout = lease_timeout
+        self.stats = {'leases': 0, 'reissued': 0, 'workers': 0}
+        self._condition = threading.Condition()
+
+    def run(self, trial_fn, num_trials, seed=None, *args):
+        """Run `trial_fn(start, stop, seed, *args)` over all trials on the workers.
+
+        `trial_fn` must be a module-level function the workers can import,
+        as for `parallel_trials.run_trials`, and `args` must pickle. A
+        missing seed is drawn from the global generator. Returns the merged
+        counters once every trial has run.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        if num_trials <= 0:
+            return trial_fn(0, 0, seed, *args)
+        self._job = (trial_fn, seed, args)
+        self._todo = deque((start, min(start + self.chunk_trials, num_trials))
+                           for start in range(0, num_trials, self.chunk_trials))
+        self._stops = dict(self._todo)
+        self._leases = {}
+        self._results = {}
+        self._counters = None
+        self._next_start = 0
+        self._num_trials = num_trials
+        self._error = None
+        self._finished = False
+
+        listener = Listener(self.address, authkey=self.authkey)
+        self.address = listener.address
+        threading.Thread(target=self._accept, args=(listener,), daemon=True).start()
+        host, port = self.address
+        local_address = ('127.0.0.1' if host in ('0.0.0.0', '') else host, port)
+        processes = [Process(target=run_worker, args=(local_address, self.authkey), daemon=True)
+                     for _ in range(self.local_workers)]
+        for process in processes:
+            process.start()
+        try:
+            with self._condition:
+                while self._next_start < num_trials and self._error is None:
+                    self._condition.wait(POLL_INTERVAL)
+                    self._reissue_expired()
+                self._finished = True
+                self._condition.notify_all()
+        finally:
+            self._finished = True
+            # accept() only returns on a connection, so wake it with one.
+            try:
+                socket.create_connection(local_address, timeout=1).close()
+            except OSError:
+                pass
+            listener.close()
+            for process in processes:
+                # A worker still running a reissued copy of a range has
+                # nothing left to contribute.
+                process.join(4 * POLL_INTERVAL)
+                if process.is_alive():
+                    process.terminate()
+        if self._error is not None:
+            raise RuntimeError(f"a worker failed:\n{self._error}")
+        return self._counters if self._counters is not None else {}
+
+    def _accept(self, listener):
+        worker = 0
+        while not self._finished:
+            try:
+                connection = listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # A client that failed the handshake, or the listener closing
+                continue
+            if self._finished:
+                connection.close()
+                break
+            worker += 1
+            with self._condition:
+                self.stats['workers'] += 1
+            threading.Thread(target=self._serve, args=(connection, worker), daemon=True).start()
+
+    def _serve(self, connection, worker):
+        """Answer one worker's requests until the run ends or the worker goes away."""
+        try:
+            while True:
+                message = connection.recv()
+                with self._condition:
+                    if message[0] == 'result':
+                        self._finish(message[1], message[2])
+                    elif message[0] == 'error':
+                        self._error = message[2]
+                        self._condition.notify_all()
+                    reply = self._next_lease(worker)
+                connection.send(reply)
+                if reply[0] == 'stop':
+                    break
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self._condition:
+                for start, (_, holder, _) in list(self._leases.items()):
+                    if holder == worker:
+                        del self._leases[start]
+                        if (start, self._stops[start]) not in self._todo:
+                            self._todo.appendleft((start, self._stops[start]))
+                            self.stats['reissued'] += 1
+            connection.close()
+
+    def _next_lease(self, worker):
+        if self._finished or self._error is not None or self._next_start >= self._num_trials:
+            return ('stop',)
+        if not self._todo:
+            return ('wait', POLL_INTERVAL)
+        start, stop = self._todo.popleft()
+        self._leases[start] = (stop, worker, time.monotonic())
+        self.stats['leases'] += 1
+        trial_fn, seed, args = self._job
+        return ('run', trial_fn, start, stop, seed, args)
+
+    def _reissue_expired(self):
+        if self.lease_timeout is None:
+            return
+        now = time.monotonic()
+        for start, (stop, holder, issued_at) in list(self._leases.items()):
+            if now - issued_at >= self.lease_timeout and (start, stop) not in self._todo:
+                # The slow copy keeps running; the first result to arrive wins.
+                self._leases[start] = (stop, holder, now)
+                self._todo.append((start, stop))
+                self.stats['reissued'] += 1
+
+    def _finish(self, start, counters):
+        if start < self._next_start or start in self._results:
+            return
+        self._leases.pop(start, None)
+        self._results[start] = counters
+        # Merge in range order so the counters do not depend on timing.
+        while self._next_start in self._results:
+            partial = self._results.pop(self._next_start)
+            self._counters = partial if self._counters is None else merge_counters([self._counters, partial])
+            self._next_start = self._stops[self._next_start]
+        self._condition.notify_all()
+
+
+def _connect(address, authkey, connect_timeout):
+    give_up_at = time.monotonic() + connect_timeout
+    while True:
+        try:
+            return Client(tuple(address), authkey=authkey)
+        except ConnectionRefusedError:
+            if time.monotonic() >= give_up_at:
+                raise
+            time.sleep(CONNECT_RETRY)
+
+
+def run_worker(address, authkey=DEFAULT_AUTHKEY, connect_timeout=CONNECT_TIMEOUT):
+    """Run trial ranges for the coordinator at `address` until it is done.
+
+    Returns the number of ranges run. A range that raises is reported to
+    the coordinator, which fails the run.
+    """
+    ranges_run = 0
+    with _connect(address, authkey, connect_timeout) as connection:
+        connection.send(('ready',))
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message[0] == 'stop':
+                break
+            if message[0] == 'wait':
+                time.sleep(message[1])
+                connection.send(('ready',))
+                continue
+            _, trial_fn, start, stop, seed, args = message
+            try:
+                counters = trial_fn(start, stop, seed, *args)
+            except Exception:
+                connection.send(('error', start, traceback.format_exc()))
+                break
+            connection.send(('result', start, counters))
+            ranges_run += 1
+    return ranges_run
+
+
+def parse_address(text, default_host='127.0.0.1'):
+    """Parse 'host:port' (or just 'port') into an address tuple."""
+    host, _, port = text.rpartition(':')
+    return (host or default_host, int(port))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run trials for a distributed_trials coordinator.")
+    parser.add_argument('--connect', required=True, metavar='HOST:PORT', help="coordinator address")
+    parser.add_argument('--authkey', default=DEFAULT_AUTHKEY.decode(), help="shared secret of the coordinator")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes to run here (default: 1)")
+    parser.add_argument('--connect-timeout', type=float, default=CONNECT_TIMEOUT,
+                        help=f"seconds to keep retrying the connection (default: {CONNECT_TIMEOUT})")
+    args = parser.parse_args(argv)
+
+    address = parse_address(args.connect)
+    authkey = args.authkey.encode()
+    processes = [Process(target=run_worker, args=(address, authkey, args.connect_timeout))
+                 for _ in range(args.processes - 1)]
+    for process in processes:
+        process.start()
+    run_worker(address, authkey, args.connect_timeout)
+    for process in processes:
+        process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
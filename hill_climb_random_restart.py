@@ -1,28 +1,49 @@
 import random
-import pandas as pd
 import time
+from contextlib import nullcontext
+
+from deadlines import Deadline
+from parallel_trials import run_trials, trial_rng
+from queens_evaluator import BoardEvaluator, unpack_board
+from random_streams import int_stream, random_board
+from reporting import print_intervals, print_results
+from trial_metrics import TrialMetrics, TrialRecordWriter
 
 def count_non_attacking_pairs(board):
     """Calculate the number of non-attacking pairs of queens."""
-    max_safe_pairs = 28  # Max pairs for 8 queens (n * (n-1) / 2 where n = 8)
+    n = len(board)
+    max_safe_pairs = n * (n - 1) // 2  # Max pairs for n queens (n * (n-1) / 2)
     attacking_pairs = 0
     
-    for i in range(8):
-        for j in range(i + 1, 8):
+    for i in range(n):
+        for j in range(i + 1, n):
             # Check if queens are in the same row or on the same diagonal
             if board[i] == board[j] or abs(board[i] - board[j]) == abs(i - j):
                 attacking_pairs += 1
 
     return max_safe_pairs - attacking_pairs
 
-def generate_random_board():
-    """Generate a random board state for 8 queens."""
-    return [random.randint(0, 7) for _ in range(8)]
+def generate_random_board(n=8, rng=random):
+    """Generate a random board state for n queens."""
+    return random_board(n, rng)
+
+def random_walk_hill_climb(board, max_no_improvement_steps, rng=random, deadline=None, memory=None, instrument=None):
+    """Perform Random-Walk Hill Climbing with additional metrics.
 
-def random_walk_hill_climb(board, max_no_improvement_steps):
-    """Perform Random-Walk Hill Climbing with additional metrics."""
-    current_board = board
-    current_safe_pairs = count_non_attacking_pairs(current_board)
+    Walks until solved, or until `deadline` (a `deadlines.Deadline`) expires,
+    in which case the best board seen is returned instead. A
+    `transposition.WalkMemory` steers the walk away from recently visited
+    boards and tabu moves. Steps are reported to `instrument` (an
+    `instrumentation.Instrument`) when one is given.
+    """
+    evaluator = BoardEvaluator(board)
+    moves = int_stream(rng, evaluator.neighbor_count())
+    if memory is not None:
+        memory.start(evaluator)
+    if instrument is not None:
+        instrument.start_run('random_walk_hill_climb', evaluator.safe_pairs)
+    best_safe_pairs = evaluator.safe_pairs
+    best_key = evaluator.key
     total_steps = 0
     sideway_moves = 0
     local_minima_count = 0
@@ -30,19 +51,28 @@ def random_walk_hill_climb(board, max_no_improvement_steps):
     
     while True:
         total_steps += 1
-        neighbors = []
-        for col in range(8):
-            for row in range(8):
-                if current_board[col] != row:
-                    new_board = list(current_board)
-                    new_board[col] = row
-                    neighbors.append((new_board, count_non_attacking_pairs(new_board)))
-        
-        current_board, current_safe_pairs = random.choice(neighbors)
+        # Pick a uniformly random neighbor and score it incrementally
+        if memory is None:
+            current_safe_pairs = evaluator.apply_move_at(next(moves))
+        else:
+            current_safe_pairs = memory.step(evaluator, rng)
+        if instrument is not None:
+            instrument.move(current_safe_pairs)
         
-        if current_safe_pairs == 28:
+        if current_safe_pairs == evaluator.max_pairs:
             time_taken = time.time() - start_time
-            return current_board, current_safe_pairs, total_steps, sideway_moves, local_minima_count, time_taken
+            if instrument is not None:
+                instrument.end_run(True)
+            return evaluator.board, current_safe_pairs, total_steps, sideway_moves, local_minima_count, time_taken
+        if current_safe_pairs > best_safe_pairs:
+            best_safe_pairs = current_safe_pairs
+            best_key = evaluator.key
+        if deadline is not None and deadline.expired(total_steps):
+            time_taken = time.time() - start_time
+            if instrument is not None:
+                instrument.end_run(False)
+            return (unpack_board(best_key, evaluator.n), best_safe_pairs, total_steps, sideway_moves,
+                    local_minima_count, time_taken)
         
         # Check for local minima
         if total_steps > max_no_improvement_steps:
@@ -50,65 +80,192 @@ def random_walk_hill_climb(board, max_no_improvement_steps):
         
         sideway_moves += 1
 
-def random_restart_hill_climb_fixed_steps(num_restarts, max_no_improvement_steps, steps_per_restart):
-    """Perform Random-Restart Hill Climbing with fixed steps and additional metrics."""
+def restart_trials(start, stop, seed, steps_per_restart, n=8, keep_steps=True, writer=None, time_limit=None,
+                   token=None, instrument=None, schedule='fixed'):
+    """Run restart trials [start, stop) for `parallel_trials.run_trials`.
+
+    Walks restart from a new random board at the cutoffs of `schedule`; the
+    other options are those of `random_restart_hill_climb_fixed_steps`.
+    """
+    from restart_schedules import make_schedule
+
+    schedule = make_schedule(schedule, steps_per_restart)
     successful_attempts = 0
     total_steps_taken = 0
+    total_restarts = 0
+    total_evaluations = 0
     total_time = 0
     all_steps_list = []
+    metrics = TrialMetrics()
     
-    for _ in range(num_restarts):
-        board = generate_random_board()
+    for trial in range(start, stop):
+        if token is not None and token.cancelled:
+            break
+        rng = random if seed is None else trial_rng(seed, trial)
+        board = generate_random_board(n, rng)
         steps = 0
+        sideways_total = 0
+        restarts = 0
+        trial_time = 0
+        deadline = Deadline(time_limit, token=token)
+        schedule.start_trial()
+        if instrument is not None:
+            instrument.start_run('restart_trial', count_non_attacking_pairs(board))
         while True:
-            final_board, safe_pairs, steps, sideway_moves, local_minima, time_taken = random_walk_hill_climb(board, steps_per_restart)
-            total_time += time_taken
-            all_steps_list.append(steps)
-            
-            if safe_pairs == 28:
-                successful_attempts += 1
-                total_steps_taken += steps
+            deadline.restart(schedule.next_cutoff())
+            if count_non_attacking_pairs(board) == n * (n - 1) // 2:
+                # A fresh board can already be a solution; no walk needed
+                safe_pairs, walk_steps, sideway_moves, time_taken = n * (n - 1) // 2, 0, 0, 0
+            else:
+                final_board, safe_pairs, walk_steps, sideway_moves, local_minima, time_taken = random_walk_hill_climb(board, steps_per_restart, rng, deadline, instrument=instrument)
+            steps += walk_steps
+            sideways_total += sideway_moves
+            trial_time += time_taken
+            solved = safe_pairs == n * (n - 1) // 2
+            if solved or deadline.reason == 'steps':
+                schedule.observe(walk_steps, solved)
+            if solved or deadline.reason != 'steps':
                 break
+            # Cut off: start over from a fresh board on the restart's own stream
+            restarts += 1
+            if instrument is not None:
+                instrument.count('restarts')
+            rng = random if seed is None else trial_rng(seed, trial, restarts)
+            board = generate_random_board(n, rng)
+
+        total_time += trial_time
+        total_restarts += restarts
+        total_evaluations += steps
+        metrics.add(solved, steps, sideways_total)
+        if keep_steps:
+            all_steps_list.append(steps)
+        if writer is not None:
+            writer.write(trial=trial, solved=solved, steps=steps, sideways_moves=sideways_total, time=trial_time)
+        if solved:
+            successful_attempts += 1
+            total_steps_taken += steps
+        if instrument is not None:
+            instrument.end_run(solved)
+    
+    return {
+        'success_count': successful_attempts,
+        'total_steps': total_steps_taken,
+        'restarts': total_restarts,
+        'evaluations': total_evaluations,
+        'total_time': total_time,
+        'steps_list': all_steps_list,
+        'metrics': metrics
+    }
+
+def random_restart_hill_climb_fixed_steps(num_restarts, max_no_improvement_steps, steps_per_restart, n=8, workers=1, seed=None,
+                                          keep_steps=True, record_path=None, time_limit=None, token=None, precision=None,
+                                          instrument=None, checkpoint_path=None, resume=False, schedule='fixed',
+                                          distributed=None):
+    """Perform Random-Restart Hill Climbing with fixed steps and additional metrics.
+
+    Walks restart at the cutoffs of `schedule`, and a trial gives up after
+    `time_limit` seconds. The other options pick how the trials run (see
+    `parallel_trials`, `sequential_stopping`, `checkpoints` and
+    `distributed_trials`); with `precision`, 'num_restarts' is the number of
+    trials run and 'intervals' is added.
+    """
+    if distributed is not None and (record_path is not None or precision is not None or checkpoint_path is not None
+                                    or instrument is not None or token is not None):
+        raise ValueError("distributed runs cannot record, checkpoint, instrument, cancel or stop early")
+    if record_path is not None and workers is not None and workers > 1:
+        raise ValueError("record_path is only supported with workers=1")
+    if checkpoint_path is not None and (record_path is not None or precision is not None):
+        raise ValueError("checkpoint_path cannot be combined with record_path or precision")
+    if instrument is not None and workers is not None and workers > 1:
+        raise ValueError("instrument is only supported with workers=1")
+    from restart_schedules import check_serial_schedule
+    check_serial_schedule(schedule, steps_per_restart, workers, checkpoint_path, precision, distributed)
+    args = (steps_per_restart, n, keep_steps)
+    with TrialRecordWriter(record_path) if record_path is not None else nullcontext() as writer:
+        if precision is not None:
+            from sequential_stopping import run_sequential
+            counters, intervals = run_sequential(restart_trials, num_restarts, precision, workers, seed, *args, writer,
+                                                 time_limit, token, instrument, schedule)
+            num_restarts = intervals['trials']
+        elif checkpoint_path is not None:
+            from checkpoints import run_checkpointed
+            counters = run_checkpointed(restart_trials, num_restarts, checkpoint_path, workers, seed, *args, writer,
+                                        time_limit, token, instrument, schedule,
+                                        params=args + (time_limit, repr(schedule)), resume=resume, token=token)
+        elif distributed is not None:
+            counters = distributed.run(restart_trials, num_restarts, seed, *args, None, time_limit, None, None,
+                                       schedule)
+        else:
+            counters = run_trials(restart_trials, num_restarts, workers, seed, *args, writer, time_limit, token,
+                                  instrument, schedule)
+    successful_attempts = counters['success_count']
+    total_steps_taken = counters['total_steps']
+    total_time = counters['total_time']
+    all_steps_list = counters['steps_list'] if keep_steps else None
+    metrics = counters['metrics']
     
     avg_steps_success = total_steps_taken / successful_attempts if successful_attempts > 0 else 0
-    avg_steps_failure = (num_restarts - successful_attempts) / num_restarts if num_restarts > 0 else 0
+    avg_steps_failure = metrics.stuck_steps.mean
     avg_time_per_restart = total_time / num_restarts if num_restarts > 0 else 0
     
-    return {
+    results = {
         'success_count': successful_attempts,
         'total_steps': total_steps_taken,
+        'restarts': counters['restarts'],
+        'total_evaluations': counters['evaluations'],
         'num_restarts': num_restarts,
         'avg_time': avg_time_per_restart,
         'avg_steps_success': avg_steps_success,
         'avg_steps_failure': avg_steps_failure,
-        'steps_list': all_steps_list
+        'steps_list': all_steps_list,
+        'metrics': metrics
     }
+    if precision is not None:
+        results['intervals'] = intervals
+    return results
+
+def main(num_trials=10000, max_no_improvement_steps=750, restart_after_steps=500, n=8, workers=1, seed=None,
+         output='table', precision=None, checkpoint_path=None, resume=False, schedule='fixed', distributed=None):
+    """Run Random-Restart Hill Climbing (Fixed Steps) simulation and print the results.
+
+    With `precision`, `num_trials` is an upper bound (see
+    `random_restart_hill_climb_fixed_steps`).
+    """
+    hill_climb_results = random_restart_hill_climb_fixed_steps(num_trials, max_no_improvement_steps, restart_after_steps,
+                                                               n, workers, seed, keep_steps=False, precision=precision,
+                                                               checkpoint_path=checkpoint_path, resume=resume,
+                                                               schedule=schedule, distributed=distributed)
+    num_trials = hill_climb_results['num_restarts']
+
+    # Display results in tabular format
+    print_results(
+        [['Random-Restart Hill-Climbing (Fixed Steps)'] + [
+            hill_climb_results['success_count'] * 100 / num_trials,  # Success (%)
+            (num_trials - hill_climb_results['success_count']) * 100 / num_trials,  # Stuck Probability (%)
+            hill_climb_results['avg_steps_success'],  # Avg Steps (Successful)
+            hill_climb_results['avg_steps_failure'],  # Avg Steps (Stuck)
+            hill_climb_results['restarts'] / num_trials,  # Avg Restarts
+            hill_climb_results['total_evaluations'] / num_trials,  # Avg Evaluations
+        ]],
+        [
+            'Algorithm', 'Success (%)', 'Stuck Probability (%)', 
+            'Avg Steps (Successful)', 'Avg Steps (Stuck)', 'Avg Restarts', 'Avg Evaluations'
+        ],
+        output
+    )
+    if precision is not None:
+        print_intervals(hill_climb_results['intervals'], output)
+    if output == 'json':
+        return hill_climb_results
+
+    # Display additional details
+    print("\nDetailed Metrics:")
+    print(f"Total Successful Solutions: {hill_climb_results['success_count']}")
+    print(f"Total Restarts: {hill_climb_results['restarts']}")
+    print(f"Total Evaluations: {hill_climb_results['total_evaluations']}")
+    print(f"Total Steps Taken for All Solutions: {hill_climb_results['metrics'].steps.total}")
+    print(f"Average Steps Taken for Each Solution: {hill_climb_results['metrics'].steps.total / hill_climb_results['success_count'] if hill_climb_results['success_count'] > 0 else 0}")
+    return hill_climb_results
 
-# Parameters
-num_trials = 10000  
-max_no_improvement_steps = 750
-restart_after_steps = 500
-
-# Run Random-Restart Hill Climbing (Fixed Steps) simulation
-hill_climb_results = random_restart_hill_climb_fixed_steps(num_trials, max_no_improvement_steps, restart_after_steps)
-
-# Display results in tabular format
-results_df = pd.DataFrame(
-    [['Random-Restart Hill-Climbing (Fixed Steps)'] + [
-        hill_climb_results['success_count'] * 100 / num_trials,  # Success (%)
-        (num_trials - hill_climb_results['success_count']) * 100 / num_trials,  # Stuck Probability (%)
-        hill_climb_results['avg_steps_success'],  # Avg Steps (Successful)
-        hill_climb_results['avg_steps_failure'],  # Avg Steps (Stuck)
-    ]],
-    columns=[
-        'Algorithm', 'Success (%)', 'Stuck Probability (%)', 
-        'Avg Steps (Successful)', 'Avg Steps (Stuck)'
-    ]
-)
-print(results_df.to_string(index=False))
-
-# Display additional details
-print("\nDetailed Metrics:")
-print(f"Total Successful Solutions: {hill_climb_results['success_count']}")
-print(f"Total Steps Taken for All Solutions: {sum(hill_climb_results['steps_list'])}")
-print(f"Average Steps Taken for Each Solution: {sum(hill_climb_results['steps_list']) / hill_climb_results['success_count'] if hill_climb_results['success_count'] > 0 else 0}")
+if __name__ == "__main__":
+    main()
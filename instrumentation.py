@@ -0,0 +1,164 @@
+import json
+import sys
+import time
+
+from trial_metrics import RunningStats
+
+# Counters kept for every run, in record order.
+COUNTERS = ('steps', 'evaluations', 'neighbors', 'improving_moves', 'plateau_moves', 'worsening_moves',
+            'local_minima', 'restarts')
+# Seconds between lines printed by SummarySink.
+SUMMARY_INTERVAL = 10.0
+
+
+class Instrument:
+    """Per-run counters and sampled step timings for the climbers.
+
+    Climbers take `instrument=None` and only touch it when one is given, so
+    disabled instrumentation costs a single None check per step. A run is
+    bracketed by `start_run` and `end_run`; in between the climber reports
+    every accepted move with the resulting safe-pair count, which classifies
+    it as improving, plateau (sideways) or worsening the same way for every
+    climber. `end_run` sends a record to each sink and adds the run to
+    `totals`.
+
+    With `sample_every` set, the average step time over each window of that
+    many steps is added to `step_seconds`.
+
+    Runs may nest: a restart driver can open a run per trial and the
+    climbers it calls then add to that run instead of emitting their own,
+    with the driver counting 'restarts'.
+    """
+
+    def __init__(self, sinks=(), sample_every=0):
+        self.sinks = list(sinks)
+        self.sample_every = sample_every
+        self.step_seconds = RunningStats()
+        self.totals = dict.fromkeys(COUNTERS, 0)
+        self.totals.update(runs=0, solved=0, seconds=0.0)
+        self.run = None
+        self.depth = 0
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.safe_pairs = 0
+        self._start_time = 0.0
+        self._countdown = 0
+        self._sample_time = 0.0
+
+    def start_run(self, run, safe_pairs):
+        """Begin a run of climber `run` from a board with `safe_pairs`."""
+        self.depth += 1
+        self.safe_pairs = safe_pairs
+        if self.depth > 1:
+            return
+        self.run = run
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self._start_time = self._sample_time = time.perf_counter()
+        self._countdown = self.sample_every
+
+    def move(self, safe_pairs, evaluations=1, neighbors=1):
+        """Record one accepted move that left the board with `safe_pairs`."""
+        counts = self.counts
+        counts['steps'] += 1
+        counts['evaluations'] += evaluations
+        counts['neighbors'] += neighbors
+        if safe_pairs > self.safe_pairs:
+            counts['improving_moves'] += 1
+        elif safe_pairs == self.safe_pairs:
+            counts['plateau_moves'] += 1
+        else:
+            counts['worsening_moves'] += 1
+        self.safe_pairs = safe_pairs
+        if self._countdown:
+            self._countdown -= 1
+            if not self._countdown:
+                now = time.perf_counter()
+                self.step_seconds.add((now - self._sample_time) / self.sample_every)
+                self._sample_time = now
+                self._countdown = self.sample_every
+
+    def count(self, counter, amount=1):
+        """Add to one of `COUNTERS` outside `move`, e.g. 'local_minima' or 'restarts'."""
+        self.counts[counter] += amount
+
+    def end_run(self, solved):
+        """Finish the current run and emit its record (None for a nested run)."""
+        self.depth -= 1
+        if self.depth:
+            return None
+        seconds = time.perf_counter() - self._start_time
+        record = {'run': self.run, 'solved': solved, 'seconds': seconds}
+        record.update(self.counts)
+        for counter, value in self.counts.items():
+            self.totals[counter] += value
+        self.totals['runs'] += 1
+        self.totals['solved'] += solved
+        self.totals['seconds'] += seconds
+        for sink in self.sinks:
+            sink.emit(record, self)
+        return record
+
+    def summary(self):
+        """Totals over all finished runs, with derived rates."""
+        summary = dict(self.totals)
+        seconds = summary['seconds']
+        summary['steps_per_sec'] = summary['steps'] / seconds if seconds else 0
+        summary['evaluations_per_sec'] = summary['evaluations'] / seconds if seconds else 0
+        if self.step_seconds.count:
+            summary['step_seconds'] = self.step_seconds.summary()
+        return summary
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close(self)
+
+
+class MemorySink:
+    """Keep every run record in a list."""
+
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record, instrument):
+        self.records.append(record)
+
+    def close(self, instrument):
+        pass
+
+
+class JsonLinesSink:
+    """Append one JSON object per run to a file, and the totals on close."""
+
+    def __init__(self, path):
+        self.file = open(path, 'a')
+
+    def emit(self, record, instrument):
+        self.file.write(json.dumps(record) + '\n')
+
+    def close(self, instrument):
+        self.file.write(json.dumps({'summary': instrument.summary()}) + '\n')
+        self.file.close()
+
+
+class SummarySink:
+    """Print the running totals at most every `interval` seconds."""
+
+    def __init__(self, interval=SUMMARY_INTERVAL, stream=None):
+        self.interval = interval
+        self.stream = stream
+        self.last_print = time.monotonic()
+
+    def emit(self, record, instrument):
+        now = time.monotonic()
+        if now - self.last_print >= self.interval:
+            self.last_print = now
+            self.print_summary(instrument)
+
+    def print_summary(self, instrument):
+        summary = instrument.summary()
+        print(f"runs={summary['runs']} solved={summary['solved']} steps={summary['steps']} "
+              f"evaluations={summary['evaluations']} plateau={summary['plateau_moves']} "
+              f"restarts={summary['restarts']} steps/s={summary['steps_per_sec']:.0f}",
+              file=self.stream or sys.stderr)
+
+    def close(self, instrument):
+        self.print_summary(instrument)
@@ -0,0 +1,236 @@
+"""Optional compiled kernels for the climbers' innermost loops.
+
+When Numba is installed, the loops below are compiled to machine code and
+used automatically: the pairwise safe-pair count, a whole steepest-ascent
+climb (`n_queens_hill_climbing.perform_hill_climb` without a deadline or
+instrument) and the pure random walk of `parameter_sweep.hit_step`.
+Without Numba, or after `set_backend('python')`, the climbers run their
+own pure-Python loops, so the package installs and runs anywhere.
+
+Both backends give identical results; `verify_backends` checks that on
+fixed seeds, and `python kernels.py` runs it. Numba and NumPy are only
+imported, and the kernels compiled, the first time a kernel runs, so
+importing the climbers stays cheap.
+"""
+import importlib.util
+import sys
+
+# Kernel implementations: 'python' runs the climbers' own loops, 'numba'
+# the compiled kernels below.
+BACKENDS = ('python', 'numba')
+# Moves handed to the compiled walk per call. Chunks grow fourfold from the
+# first size, so short walks do not draw far more moves than they use.
+FIRST_WALK_CHUNK = 64
+WALK_CHUNK = 4096
+# Boards compared by `verify_backends`.
+VERIFY_BOARDS = 500
+
+backend = 'numba' if importlib.util.find_spec('numba') is not None else 'python'
+# Set by _kernels() on first use; the compiled kernels read np as a global.
+np = None
+_compiled_kernels = None
+
+
+def set_backend(name):
+    """Select the kernel backend; returns the previous one."""
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend: {name!r}")
+    if name == 'numba' and importlib.util.find_spec('numba') is None:
+        raise ImportError("the numba kernel backend needs numba installed")
+    previous = backend
+    backend = name
+    return previous
+
+
+def compiled():
+    """Return True when the compiled kernels are in use."""
+    return backend == 'numba'
+
+
+def _count_safe_pairs(board):
+    n = len(board)
+    attacking_pairs = 0
+    for i in range(n):
+        for j in range(i + 1, n):
+            if board[i] == board[j] or abs(board[i] - board[j]) == j - i:
+                attacking_pairs += 1
+    return n * (n - 1) // 2 - attacking_pairs
+
+
+def _steepest_climb(board):
+    # Same walk as perform_hill_climb with BoardEvaluator.best_move; `board`
+    # is updated in place.
+    n = len(board)
+    rows = np.zeros(n, np.int64)
+    diagonals = np.zeros(2 * n - 1, np.int64)
+    anti_diagonals = np.zeros(2 * n - 1, np.int64)
+    for col in range(n):
+        rows[board[col]] += 1
+        diagonals[board[col] - col + n - 1] += 1
+        anti_diagonals[board[col] + col] += 1
+    attacking_pairs = 0
+    for line in range(2 * n - 1):
+        if line < n:
+            attacking_pairs += rows[line] * (rows[line] - 1) // 2
+        attacking_pairs += diagonals[line] * (diagonals[line] - 1) // 2
+        attacking_pairs += anti_diagonals[line] * (anti_diagonals[line] - 1) // 2
+    safe_pairs = n * (n - 1) // 2 - attacking_pairs
+
+    steps = 0
+    while True:
+        steps += 1
+        best_col = -1
+        best_row = -1
+        best_delta = 0
+        for col in range(n):
+            current_row = board[col]
+            offset = n - 1 - col
+            released = (rows[current_row] + diagonals[current_row + offset]
+                        + anti_diagonals[current_row + col] - 3)
+            if released <= best_delta:
+                continue
+            for row in range(n):
+                if row != current_row:
+                    delta = released - (rows[row] + diagonals[row + offset] + anti_diagonals[row + col])
+                    if delta > best_delta:
+                        best_col = col
+                        best_row = row
+                        best_delta = delta
+        if best_col < 0:
+            return safe_pairs, steps
+        old_row = board[best_col]
+        offset = n - 1 - best_col
+        rows[old_row] -= 1
+        diagonals[old_row + offset] -= 1
+        anti_diagonals[old_row + best_col] -= 1
+        rows[best_row] += 1
+        diagonals[best_row + offset] += 1
+        anti_diagonals[best_row + best_col] += 1
+        board[best_col] = best_row
+        safe_pairs += best_delta
+
+
+def _walk(board, rows, diagonals, anti_diagonals, safe_pairs, moves):
+    # Apply neighbor moves (BoardEvaluator.apply_move_at numbering) until the
+    # board is a solution; returns (index of that move or -1, safe pairs).
+    n = len(board)
+    max_pairs = n * (n - 1) // 2
+    for index in range(len(moves)):
+        col = moves[index] // (n - 1)
+        row = moves[index] - col * (n - 1)
+        old_row = board[col]
+        if row >= old_row:
+            row += 1
+        offset = n - 1 - col
+        rows[old_row] -= 1
+        diagonals[old_row + offset] -= 1
+        anti_diagonals[old_row + col] -= 1
+        released = rows[old_row] + diagonals[old_row + offset] + anti_diagonals[old_row + col]
+        gained = rows[row] + diagonals[row + offset] + anti_diagonals[row + col]
+        rows[row] += 1
+        diagonals[row + offset] += 1
+        anti_diagonals[row + col] += 1
+        board[col] = row
+        safe_pairs += released - gained
+        if safe_pairs == max_pairs:
+            return index, safe_pairs
+    return -1, safe_pairs
+
+
+def _kernels():
+    """(count_safe_pairs, steepest_climb, walk) compiled with Numba, built once."""
+    global np, _compiled_kernels
+    if _compiled_kernels is None:
+        import numba
+        import numpy
+        np = numpy
+        # Compiled on first call and cached next to the module.
+        jit = numba.njit(cache=True)
+        _compiled_kernels = (jit(_count_safe_pairs), jit(_steepest_climb), jit(_walk))
+    return _compiled_kernels
+
+
+def count_safe_pairs(board):
+    """Count the non-attacking pairs of queens on `board`."""
+    if backend == 'numba':
+        count_kernel = _kernels()[0]
+        return int(count_kernel(np.asarray(board, dtype=np.int64)))
+    return _count_safe_pairs(board)
+
+
+def steepest_climb(board):
+    """Compiled `perform_hill_climb`: returns (final board, safe pairs, steps)."""
+    climb_kernel = _kernels()[1]
+    board = np.array(board, dtype=np.int64)
+    safe_pairs, steps = climb_kernel(board)
+    return board.tolist(), int(safe_pairs), int(steps)
+
+
+def walk_hit_step(evaluator, moves, horizon):
+    """Compiled walk loop of `parameter_sweep.hit_step`.
+
+    Applies moves from the iterator `moves` to `evaluator`'s board and
+    returns the move that first reaches a solution, or None after `horizon`
+    moves. Moves are drawn in chunks, so a few more may be taken from
+    `moves` than the walk uses, and `evaluator` itself is left unchanged.
+    """
+    walk_kernel = _kernels()[2]
+    state = [np.array(values, dtype=np.int64) for values in
+             (evaluator.board, evaluator.rows, evaluator.diagonals, evaluator.anti_diagonals)]
+    safe_pairs = evaluator.safe_pairs
+    done = 0
+    size = FIRST_WALK_CHUNK
+    while done < horizon:
+        size = min(size, horizon - done)
+        chunk = np.fromiter(moves, dtype=np.int64, count=size)
+        index, safe_pairs = walk_kernel(*state, safe_pairs, chunk)
+        if index >= 0:
+            return done + int(index) + 1
+        done += size
+        size = min(size * 4, WALK_CHUNK)
+    return None
+
+
+def verify_backends(num_boards=VERIFY_BOARDS, sizes=(4, 6, 8, 10), seed=0, horizon=20000):
+    """Run every kernel on both backends for fixed seeds.
+
+    Returns a list of mismatches, empty when the backends agree.
+    """
+    from n_queens_hill_climbing import perform_hill_climb
+    from parallel_trials import trial_rng
+    from parameter_sweep import hit_step
+    from random_streams import random_board
+
+    def run_all(name):
+        previous = set_backend(name)
+        try:
+            outcomes = []
+            for n in sizes:
+                for trial in range(num_boards):
+                    rng = trial_rng(f"{seed}:{n}", trial)
+                    board = random_board(n, rng)
+                    outcomes.append((n, trial, 'count_safe_pairs', count_safe_pairs(board)))
+                    outcomes.append((n, trial, 'perform_hill_climb', perform_hill_climb(list(board))))
+                    outcomes.append((n, trial, 'hit_step', hit_step(board, horizon, rng)))
+            return outcomes
+        finally:
+            set_backend(previous)
+
+    mismatches = []
+    for python_outcome, numba_outcome in zip(run_all('python'), run_all('numba')):
+        if python_outcome != numba_outcome:
+            n, trial, kernel, expected = python_outcome
+            mismatches.append(f"n={n} trial {trial} {kernel}: python {expected!r}, numba {numba_outcome[3]!r}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    if importlib.util.find_spec('numba') is None:
+        print("numba is not installed; only the python backend is available.")
+        sys.exit(0)
+    problems = verify_backends()
+    for problem in problems:
+        print(problem)
+    print("Backends differ." if problems else "Backends agree.")
+    sys.exit(1 if problems else 0)
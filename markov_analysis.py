@@ -0,0 +1,179 @@
+"""Exact analysis of the pure random walk in `random_walk_hill_climbing`.
+
+The walk moves one uniformly chosen queen to a uniformly chosen other row
+every step, so it is a Markov chain on all n**n boards whose transition
+matrix P has n * (n - 1) equal entries per row. Rather than storing P (over
+900 million non-zeros for 8 queens), boards are laid out as an n-dimensional
+tensor indexed by the rows of the queens, and P is applied to a vector by
+summing along each column's axis:
+
+    (P v)(x) = (sum over columns c of sum over rows r of v(x with c -> r) - n v(x)) / (n (n - 1))
+
+That costs a few passes over one vector per step, which makes step-limited
+success probabilities a sequence of matrix-vector products and the expected
+hitting time a conjugate-gradient solve.
+
+The chain is not lumped by conflict count because that partition is not
+lumpable: boards with equal counts reach solutions with different
+probabilities. Lumping by the four board symmetries would be exact but
+would give up the tensor layout that makes P cheap.
+"""
+import numpy as np
+
+from parameter_sweep import walk_length
+from queens_evaluator import pack_board
+
+# Largest state space handled, in boards; 8 queens has 16.8 million.
+MAX_STATES = 1 << 24
+# Relative residual at which the hitting-time solve stops.
+HITTING_TIME_TOLERANCE = 1e-10
+MAX_CG_ITERATIONS = 10000
+
+
+def all_solutions(n=8):
+    """Every n-queens solution as a board (row of the queen in each column)."""
+    solutions = []
+    board = []
+
+    def place(col, rows, diagonals, anti_diagonals):
+        if col == n:
+            solutions.append(list(board))
+            return
+        for row in range(n):
+            if row not in rows and row - col not in diagonals and row + col not in anti_diagonals:
+                board.append(row)
+                place(col + 1, rows | {row}, diagonals | {row - col}, anti_diagonals | {row + col})
+                board.pop()
+
+    place(0, frozenset(), frozenset(), frozenset())
+    return solutions
+
+
+def _check_size(n):
+    if n < 2 or n ** n > MAX_STATES:
+        raise ValueError(f"Exact analysis supports 2 <= n with n**n <= {MAX_STATES} boards")
+
+
+def solution_mask(n=8):
+    """Boolean tensor of shape (n,) * n marking the solved boards.
+
+    Flat indices are `pack_board` keys, so column c is axis n - 1 - c.
+    """
+    _check_size(n)
+    mask = np.zeros(n ** n, dtype=bool)
+    for solution in all_solutions(n):
+        mask[pack_board(solution)] = True
+    return mask.reshape((n,) * n)
+
+
+def apply_transition(vector):
+    """Return P @ vector for the random walk, with vector shaped (n,) * n."""
+    n = vector.ndim
+    result = vector * -n
+    for axis in range(n):
+        result += vector.sum(axis=axis, keepdims=True)
+    result /= n * (n - 1)
+    return result
+
+
+def success_within(max_steps, n=8):
+    """P(walk from a uniform random board hits a solution within t steps), t = 0..max_steps.
+
+    Hitting means landing on a solution after at least one move, which is
+    when the walk checks for one.
+    """
+    solved = solution_mask(n)
+    within = np.zeros(max_steps + 1)
+    hit = np.zeros(solved.shape)
+    for step in range(1, max_steps + 1):
+        # hit(x) = P(solution within `step` moves from x): take one move, then
+        # either stand on a solution or hit one in the remaining moves.
+        hit = apply_transition(np.where(solved, 1.0, hit))
+        within[step] = hit.mean()
+    return within
+
+
+def expected_hitting_time(n=8, tolerance=HITTING_TIME_TOLERANCE, max_iterations=MAX_CG_ITERATIONS):
+    """Expected moves until the unlimited walk first lands on a solution.
+
+    Solves (I - Q) h = 1 over unsolved boards, where Q is P restricted to
+    them, by conjugate gradients deflated by the constant vector: that
+    direction carries the single eigenvalue near zero, and the rest of the
+    spectrum of I - P is at least 1 / (n - 1), so the solve converges in a
+    handful of iterations. Returns (mean over uniform start boards,
+    iterations used).
+    """
+    solved = solution_mask(n)
+    unsolved = ~solved
+
+    def operator(vector):
+        vector = np.where(unsolved, vector, 0.0)
+        return np.where(unsolved, vector - apply_transition(vector), 0.0)
+
+    ones = unsolved.astype(float)
+    ones_image = operator(ones)
+    ones_energy = np.vdot(ones, ones_image)
+
+    def deflate(vector):
+        # Remove the A-conjugate component along the constant vector.
+        return vector - ones * (np.vdot(ones_image, vector) / ones_energy)
+
+    rhs = ones
+    hitting = ones * (np.vdot(ones, rhs) / ones_energy)
+    residual = rhs - operator(hitting)
+    direction = deflate(residual)
+    residual_norm = np.vdot(residual, residual)
+    rhs_norm = np.vdot(rhs, rhs)
+    iterations = 0
+    while iterations < max_iterations and residual_norm > tolerance * tolerance * rhs_norm:
+        image = operator(direction)
+        step = residual_norm / np.vdot(direction, image)
+        hitting += step * direction
+        residual -= step * image
+        new_norm = np.vdot(residual, residual)
+        direction = deflate(residual + (new_norm / residual_norm) * direction)
+        residual_norm = new_norm
+        iterations += 1
+
+    # From any start the walk takes one move, then stops on a solution or
+    # continues from the unsolved board it reached.
+    start_times = 1.0 + apply_transition(np.where(unsolved, hitting, 0.0))
+    return float(start_times.mean()), iterations
+
+
+def results_from_within(within, max_no_improvement_steps, sideways_limit, n=8):
+    """`simulate_random_walk` columns for one limit pair from `success_within` output."""
+    length = walk_length(max_no_improvement_steps, sideways_limit)
+    if length == 0:
+        # No moves are made; the start board is returned as is.
+        success = len(all_solutions(n)) / n ** n
+        return [success * 100, (1 - success) * 100, 0, 0, 0, 0]
+
+    success = within[length]
+    hits = np.diff(within[:length + 1])
+    steps = np.arange(1, length + 1)
+    avg_success_steps = float(hits @ steps / success) if success > 0 else 0
+    # A successful walk makes one sideways move per step except the last;
+    # a stuck walk makes `length` of each.
+    return [
+        float(success * 100), float((1 - success) * 100),
+        avg_success_steps, length if success < 1 else 0,
+        avg_success_steps - 1 if success > 0 else 0, length if success < 1 else 0,
+    ]
+
+
+def exact_random_walk_results(max_no_improvement_steps, sideways_limit, n=8):
+    """Exact counterpart of `simulate_random_walk`, in the same six columns."""
+    within = success_within(walk_length(max_no_improvement_steps, sideways_limit), n)
+    return results_from_within(within, max_no_improvement_steps, sideways_limit, n)
+
+
+def exact_random_walk_table(max_no_improvement_steps_values, sideways_limits, n=8):
+    """Exact results for every limit pair from a single pass of the chain.
+
+    Returns rows of [max_no_improvement_steps, sideways_limit] followed by
+    the `simulate_random_walk` columns.
+    """
+    pairs = [(steps, limit) for steps in max_no_improvement_steps_values for limit in sideways_limits]
+    within = success_within(max(walk_length(steps, limit) for steps, limit in pairs), n)
+    return [[steps, limit] + results_from_within(within, steps, limit, n) for steps, limit in pairs]
@@ -0,0 +1,222 @@
+import random
+from array import array
+
+from queens_evaluator import attacking_line_pairs
+
+# Columns placed conflict-free during the greedy phase give up and take a
+# random free row after this many rejected candidates.
+GREEDY_PLACEMENT_TRIES = 64
+# Number of final columns that skip the greedy search entirely; filling the
+# last few rows conflict-free costs far more tries than repairing them later.
+RANDOM_PLACEMENT_TAIL = 64
+# Repair steps without an improving swap, per queen, before starting over
+# from a fresh placement. Only small boards ever get stuck this long.
+STALL_STEPS_PER_QUEEN = 50
+
+
+class ConflictBoard:
+    """Permutation board with diagonal conflict counters for large n.
+
+    Every row holds exactly one queen, so only diagonal attacks are possible.
+    Moves swap the rows of two columns, which is two single-queen moves that
+    keep the permutation intact. Memory is linear in n.
+    """
+
+    def __init__(self, board):
+        self.board = board if isinstance(board, array) else array('l', board)
+        self.n = n = len(self.board)
+        self.max_pairs = n * (n - 1) // 2
+        self.diagonals = array('l', [0]) * (2 * n - 1)  # row - col + n - 1
+        self.anti_diagonals = array('l', [0]) * (2 * n - 1)  # row + col
+        offset = n - 1
+        diagonals = self.diagonals
+        anti_diagonals = self.anti_diagonals
+        for col, row in enumerate(self.board):
+            diagonals[row - col + offset] += 1
+            anti_diagonals[row + col] += 1
+        self.conflicts = sum(attacking_line_pairs(c) for c in diagonals if c > 1)
+        self.conflicts += sum(attacking_line_pairs(c) for c in anti_diagonals if c > 1)
+        self.rebuild_conflicted()
+
+    @property
+    def safe_pairs(self):
+        return self.max_pairs - self.conflicts
+
+    def queen_conflicts(self, col):
+        """Number of queens attacking the queen in `col`."""
+        row = self.board[col]
+        return (self.diagonals[row - col + self.n - 1]
+                + self.anti_diagonals[row + col] - 2)
+
+    def rebuild_conflicted(self):
+        """Rescan the board for conflicted columns in O(n)."""
+        diagonals = self.diagonals
+        anti_diagonals = self.anti_diagonals
+        offset = self.n - 1
+        self.conflicted = array('l', [
+            col for col, row in enumerate(self.board)
+            if diagonals[row - col + offset] > 1 or anti_diagonals[row + col] > 1
+        ])
+        self.in_conflicted = bytearray(self.n)
+        for col in self.conflicted:
+            self.in_conflicted[col] = 1
+
+    def _mark_conflicted(self, col):
+        if not self.in_conflicted[col] and self.queen_conflicts(col):
+            self.conflicted.append(col)
+            self.in_conflicted[col] = 1
+
+    def random_conflicted_column(self, rng):
+        """Return a random conflicted column, or None when there are none.
+
+        The set is maintained lazily: moves add the columns they touch, stale
+        entries are dropped when drawn, and the set is rebuilt from scratch in
+        the rare case it runs dry while conflicts remain.
+        """
+        while True:
+            conflicted = self.conflicted
+            if not conflicted:
+                if not self.conflicts:
+                    return None
+                self.rebuild_conflicted()
+                continue
+            index = int(rng.random() * len(conflicted))
+            col = conflicted[index]
+            if self.queen_conflicts(col):
+                return col
+            conflicted[index] = conflicted[-1]
+            conflicted.pop()
+            self.in_conflicted[col] = 0
+
+    def swap_delta(self, col_a, col_b):
+        """Change in attacking pairs if columns `col_a` and `col_b` swap rows."""
+        board = self.board
+        diagonals = self.diagonals
+        anti_diagonals = self.anti_diagonals
+        offset = self.n - 1
+        row_a = board[col_a]
+        row_b = board[col_b]
+        old_d_a = row_a - col_a + offset
+        old_d_b = row_b - col_b + offset
+        old_a_a = row_a + col_a
+        old_a_b = row_b + col_b
+        new_d_a = row_b - col_a + offset
+        new_d_b = row_a - col_b + offset
+        new_a_a = row_b + col_a
+        new_a_b = row_a + col_b
+
+        released = (diagonals[old_d_a] + diagonals[old_d_b]
+                    + anti_diagonals[old_a_a] + anti_diagonals[old_a_b] - 4)
+        # The two queens attack each other on the old lines only once.
+        if old_d_a == old_d_b or old_a_a == old_a_b:
+            released -= 1
+        gained = (diagonals[new_d_a] + diagonals[new_d_b]
+                  + anti_diagonals[new_a_a] + anti_diagonals[new_a_b])
+        # Counters still include both queens on lines they are leaving.
+        gained -= ((new_d_a == old_d_a) + (new_d_a == old_d_b)
+                   + (new_d_b == old_d_a) + (new_d_b == old_d_b)
+                   + (new_a_a == old_a_a) + (new_a_a == old_a_b)
+                   + (new_a_b == old_a_a) + (new_a_b == old_a_b))
+        if new_d_a == new_d_b or new_a_a == new_a_b:
+            gained += 1
+        return gained - released
+
+    def swap(self, col_a, col_b):
+        """Swap the rows of two columns, updating counters in place."""
+        board = self.board
+        diagonals = self.diagonals
+        anti_diagonals = self.anti_diagonals
+        offset = self.n - 1
+        row_a = board[col_a]
+        row_b = board[col_b]
+        for col, row in ((col_a, row_a), (col_b, row_b)):
+            for line, index in ((diagonals, row - col + offset), (anti_diagonals, row + col)):
+                line[index] -= 1
+                self.conflicts -= line[index]
+        board[col_a] = row_b
+        board[col_b] = row_a
+        for col, row in ((col_a, row_b), (col_b, row_a)):
+            for line, index in ((diagonals, row - col + offset), (anti_diagonals, row + col)):
+                self.conflicts += line[index]
+                line[index] += 1
+        self._mark_conflicted(col_a)
+        self._mark_conflicted(col_b)
+
+
+def greedy_random_board(n, rng=random):
+    """Place one queen per row and column, avoiding diagonal attacks greedily.
+
+    Each column draws random unused rows until one is free of diagonal
+    attacks from the queens already placed; the last columns are filled at
+    random. For large n this leaves only a handful of conflicts.
+    """
+    rows = array('l', range(n))
+    diagonals = bytearray(2 * n - 1)
+    anti_diagonals = bytearray(2 * n - 1)
+    offset = n - 1
+    uniform = rng.random
+    greedy_columns = max(0, n - RANDOM_PLACEMENT_TAIL)
+
+    for col in range(n):
+        remaining = n - col
+        tries = GREEDY_PLACEMENT_TRIES if col < greedy_columns else 1
+        for _ in range(tries):
+            pick = col + int(uniform() * remaining)
+            row = rows[pick]
+            if not diagonals[row - col + offset] and not anti_diagonals[row + col]:
+                break
+        rows[col], rows[pick] = rows[pick], rows[col]
+        diagonals[row - col + offset] = 1
+        anti_diagonals[row + col] = 1
+    return rows
+
+
+def solve_large_n(n, strategy='hill_climb', walk_probability=0.5, max_steps=None, rng=random, deadline=None):
+    """Solve n-queens with min-conflicts repair over row swaps.
+
+    `strategy` mirrors the small-board climbers: 'hill_climb' only accepts
+    swaps that remove attacks, while 'random_walk' also takes sideways swaps
+    (no change in attacks) with probability `walk_probability`. Accepting
+    worsening swaps as the 8-queens walks do would add conflicts faster than
+    large boards can repair them. Each step repairs a random conflicted
+    column, and a board that stops improving is replaced by a fresh placement.
+    Repair stops after `max_steps` or when `deadline` expires, leaving the
+    current board. Returns (board, safe_pairs, steps); the board is an
+    `array` of rows, one per column.
+    """
+    if strategy not in ('hill_climb', 'random_walk'):
+        raise ValueError(f"Unknown strategy: {strategy!r}")
+    if n < 4:
+        # No solution exists for 2 and 3 queens; return the placement as is.
+        board = ConflictBoard(greedy_random_board(n, rng))
+        return board.board, board.safe_pairs, 0
+
+    board = ConflictBoard(greedy_random_board(n, rng))
+    uniform = rng.random
+    walk = walk_probability if strategy == 'random_walk' else 0.0
+    stall_limit = STALL_STEPS_PER_QUEEN * n
+    steps = 0
+    stalled_steps = 0
+
+    while max_steps is None or steps < max_steps:
+        col = board.random_conflicted_column(rng)
+        if col is None:
+            break
+        if deadline is not None and deadline.expired(steps):
+            break
+        steps += 1
+        stalled_steps += 1
+        partner = int(uniform() * n)
+        if partner == col:
+            continue
+        delta = board.swap_delta(col, partner)
+        if delta < 0:
+            board.swap(col, partner)
+            stalled_steps = 0
+        elif delta == 0 and uniform() < walk:
+            board.swap(col, partner)
+        elif stalled_steps > stall_limit:
+            board = ConflictBoard(greedy_random_board(n, rng))
+            stalled_steps = 0
+
+    return board.board, board.safe_pairs, steps
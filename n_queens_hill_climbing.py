@@ -1,111 +1,199 @@
 import random
 
-def generate_random_board():
-    """Generate a random 8-queens board state (one queen per column)."""
-    return [random.randint(0, 7) for _ in range(8)]
+import kernels
+from parallel_trials import trial_rng
+from queens_evaluator import BoardEvaluator
+from random_streams import random_board
+from reporting import print_intervals
+from trial_metrics import TrialMetrics
+
+def generate_random_board(n=8, rng=random):
+    """Generate a random n-queens board state (one queen per column)."""
+    return random_board(n, rng)
 
 def count_safe_queen_pairs(board):
     """Count the number of non-attacking queen pairs."""
-    total_pairs = 28  # Total number of pairs of queens in an 8-queens problem (C(8, 2) = 28)
-    attacking_pairs = 0
-    for i in range(len(board)):
-        for j in range(i + 1, len(board)):
-            if board[i] == board[j] or abs(board[i] - board[j]) == abs(i - j):
-                attacking_pairs += 1
-    return total_pairs - attacking_pairs
-
-def perform_hill_climb(board):
-    """Perform hill-climbing to maximize the number of non-attacking pairs."""
-    current_safe_pairs = count_safe_queen_pairs(board)
+    return kernels.count_safe_pairs(board)
+
+def perform_hill_climb(board, deadline=None, instrument=None):
+    """Perform hill-climbing to maximize the number of non-attacking pairs.
+
+    Every step improves the board, so when `deadline` expires the current
+    board is the best one seen and is returned as is. `instrument` counts
+    every neighbor scan as n * (n - 1) evaluations. Without either, the
+    climb runs as one compiled kernel when `kernels` has one.
+    """
+    if deadline is None and instrument is None and kernels.compiled():
+        return kernels.steepest_climb(board)
+    evaluator = BoardEvaluator(board)
+    neighbor_count = evaluator.neighbor_count()
+    if instrument is not None:
+        instrument.start_run('perform_hill_climb', evaluator.safe_pairs)
     steps_taken = 0
     
     while True:
         steps_taken += 1
-        neighbors = []
-        for col in range(8):
-            for row in range(8):
-                if board[col] != row:
-                    new_board = list(board)
-                    new_board[col] = row
-                    neighbors.append((new_board, count_safe_queen_pairs(new_board)))
-        
-        # Sort neighbors by number of non-attacking pairs
-        neighbors.sort(key=lambda x: x[1], reverse=True)
-        
-        # Choose the best neighbor
-        best_neighbor, best_safe_pairs = neighbors[0]
+        # Choose the best neighbor (first one in column/row order on ties)
+        best_move = evaluator.best_move()
         
         # Check if improvement is possible
-        if best_safe_pairs > current_safe_pairs:
-            board = best_neighbor
-            current_safe_pairs = best_safe_pairs
+        if best_move is not None and (deadline is None or not deadline.expired(steps_taken - 1, neighbor_count)):
+            col, row, _ = best_move
+            evaluator.apply_move(col, row)
+            if instrument is not None:
+                instrument.move(evaluator.safe_pairs, neighbor_count, neighbor_count)
         else:
             # No improvement, return current board
-            return board, current_safe_pairs, steps_taken
+            if instrument is not None:
+                if best_move is None and not evaluator.is_solution():
+                    instrument.count('local_minima')
+                instrument.count('evaluations', neighbor_count)
+                instrument.count('neighbors', neighbor_count)
+                instrument.end_run(evaluator.is_solution())
+            return evaluator.board, evaluator.safe_pairs, steps_taken
+
+def hill_climb_trials(start, stop, seed, n=8):
+    """Run hill-climbing trials [start, stop) and return their mergeable counters.
+
+    'best' lists the range's best climb as one (safe_pairs, steps, board)
+    tuple, so merged ranges keep one candidate per range, in trial order.
+    """
+    success_steps = []
+    stuck_steps = []
+    best = (0, float('inf'), None)
+    for trial in range(start, stop):
+        board = generate_random_board(n, random if seed is None else trial_rng(seed, trial))
+        final_board, final_safe_pairs, steps_taken = perform_hill_climb(board)
+        if final_safe_pairs == n * (n - 1) // 2:
+            success_steps.append(steps_taken)
+        else:
+            stuck_steps.append(steps_taken)
+        if final_safe_pairs > best[0] or (final_safe_pairs == best[0] and steps_taken < best[1]):
+            best = (final_safe_pairs, steps_taken, final_board)
+    return {'success_steps': success_steps, 'stuck_steps': stuck_steps, 'best': [best]}
+
+def simulate_hill_climbing(num_trials, n=8, batch=False, basin_map=None, precision=None, instrument=None, seed=None,
+                           distributed=None):
+    """Run multiple simulations and return the best results.
+
+    With `batch=True` all trials advance in lockstep as NumPy arrays. Given
+    the path of a table from `basin_map.build_basin_map`, the results are
+    exact over every start board instead of sampled from `num_trials`.
+
+    Given a `sequential_stopping.PrecisionTarget` as `precision`, up to
+    `num_trials` trials run until the target is met, and the intervals from
+    the last look are appended to the returned tuple. Each climb is
+    reported to `instrument` if one is given. A `seed` draws every start
+    board from its own replayable stream (`parallel_trials.trial_rng`).
+    Given a `distributed_trials.Coordinator` as `distributed`, the trials
+    run on its workers; seeded runs give the same results as serial ones.
+    """
+    if (precision is not None or instrument is not None) and (batch or basin_map is not None):
+        raise ValueError("precision and instrument are only supported for sampled serial runs")
+    if distributed is not None and (batch or basin_map is not None or precision is not None or instrument is not None):
+        raise ValueError("distributed runs cannot be combined with batch, basin_map, precision or instrument")
+    if basin_map is not None:
+        from basin_map import exact_hill_climbing_results, load_basin_map
+        return exact_hill_climbing_results(load_basin_map(basin_map))
+    if batch:
+        from batch_simulator import simulate_hill_climbing_batch
+        return simulate_hill_climbing_batch(num_trials, n)
 
-def simulate_hill_climbing(num_trials):
-    """Run multiple simulations and return the best results."""
     successful_runs = 0
     success_steps = []
     stuck_steps = []
     optimal_solution = None
     max_safe_pairs = 0
     fewest_steps = float('inf')
+    if precision is not None:
+        from sequential_stopping import SequentialTest
+        test = SequentialTest(precision, num_trials)
+        metrics = TrialMetrics()
     
-    for _ in range(num_trials):
-        board = generate_random_board()
-        final_board, final_safe_pairs, steps_taken = perform_hill_climb(board)
-        
-        if final_safe_pairs == 28:
-            successful_runs += 1
-            success_steps.append(steps_taken)
-        else:
-            stuck_steps.append(steps_taken)
-        
-        # Track the best solution found
-        if (final_safe_pairs > max_safe_pairs or
-            (final_safe_pairs == max_safe_pairs and steps_taken < fewest_steps)):
-            optimal_solution = final_board
-            max_safe_pairs = final_safe_pairs
-            fewest_steps = steps_taken
+    if distributed is not None:
+        counters = distributed.run(hill_climb_trials, num_trials, seed, n)
+        success_steps = counters['success_steps']
+        stuck_steps = counters['stuck_steps']
+        successful_runs = len(success_steps)
+        # Same tie-break as the serial loop: the first of the fewest steps wins
+        for final_safe_pairs, steps_taken, final_board in counters['best']:
+            if (final_safe_pairs > max_safe_pairs or
+                (final_safe_pairs == max_safe_pairs and steps_taken < fewest_steps)):
+                optimal_solution = final_board
+                max_safe_pairs = final_safe_pairs
+                fewest_steps = steps_taken
+    else:
+        for trial in range(num_trials):
+            board = generate_random_board(n, random if seed is None else trial_rng(seed, trial))
+            final_board, final_safe_pairs, steps_taken = perform_hill_climb(board, instrument=instrument)
+            
+            if final_safe_pairs == n * (n - 1) // 2:
+                successful_runs += 1
+                success_steps.append(steps_taken)
+            else:
+                stuck_steps.append(steps_taken)
+            
+            # Track the best solution found
+            if (final_safe_pairs > max_safe_pairs or
+                (final_safe_pairs == max_safe_pairs and steps_taken < fewest_steps)):
+                optimal_solution = final_board
+                max_safe_pairs = final_safe_pairs
+                fewest_steps = steps_taken
+
+            if precision is not None:
+                metrics.add(final_safe_pairs == n * (n - 1) // 2, steps_taken)
+                if metrics.trials >= test.next_look and test.update(metrics):
+                    break
     
+    num_trials = successful_runs + len(stuck_steps)
     success_rate = successful_runs / num_trials
     avg_steps_to_success = sum(success_steps) / successful_runs if successful_runs > 0 else 0
     avg_steps_to_stuck = sum(stuck_steps) / (num_trials - successful_runs) if (num_trials - successful_runs) > 0 else 0
     
-    return (success_rate, avg_steps_to_success, avg_steps_to_stuck, 
-            optimal_solution, max_safe_pairs, fewest_steps)
+    results = (success_rate, avg_steps_to_success, avg_steps_to_stuck,
+               optimal_solution, max_safe_pairs, fewest_steps)
+    if precision is not None:
+        results += (test.intervals,)
+    return results
 
 def print_board(board):
     """Print the board with queens and dots."""
-    chessboard = [['.' for _ in range(8)] for _ in range(8)]
+    chessboard = [['.' for _ in board] for _ in board]
     for col, row in enumerate(board):
         chessboard[row][col] = 'Q'
     
     for row in chessboard:
         print(' '.join(row))
 
-# Parameters
-num_trials = 1000
-best_outcome = None
-highest_success_rate = 0
-
-# Run simulations
-print("Running hill-climbing simulations...")
-simulation_results = simulate_hill_climbing(num_trials)
-
-# Check if the current results have a better success rate
-if simulation_results[0] > highest_success_rate:
-    highest_success_rate = simulation_results[0]
-    best_outcome = simulation_results
-
-# Print the best results
-if best_outcome:
-    print("\nBest Results Found:")
-    print(f"Success Rate: {best_outcome[0] * 100:.2f}%")
-    print(f"Average Steps for Success: {best_outcome[1]}")
-    print(f"Average Steps when Stuck: {best_outcome[2]}")
-    print("\nBest Solution Found:")
-    print_board(best_outcome[3])
-    print(f"Non-Attacking Pairs: {best_outcome[4]}")
-    print(f"Steps to Find Solution: {best_outcome[5]}")
+def main(num_trials=1000, n=8, batch=False, basin_map=None, precision=None, seed=None, distributed=None):
+    """Run hill-climbing simulations and print the best results."""
+    best_outcome = None
+    highest_success_rate = 0
+
+    # Run simulations
+    print("Running hill-climbing simulations...")
+    simulation_results = simulate_hill_climbing(num_trials, n, batch, basin_map, precision, seed=seed,
+                                                distributed=distributed)
+
+    # Check if the current results have a better success rate
+    if simulation_results[0] > highest_success_rate:
+        highest_success_rate = simulation_results[0]
+        best_outcome = simulation_results
+
+    # Print the best results
+    if best_outcome:
+        print("\nBest Results Found:")
+        print(f"Success Rate: {best_outcome[0] * 100:.2f}%")
+        print(f"Average Steps for Success: {best_outcome[1]}")
+        print(f"Average Steps when Stuck: {best_outcome[2]}")
+        print("\nBest Solution Found:")
+        print_board(best_outcome[3])
+        print(f"Non-Attacking Pairs: {best_outcome[4]}")
+        print(f"Steps to Find Solution: {best_outcome[5]}")
+    if precision is not None:
+        print()
+        print_intervals(simulation_results[6])
+    return simulation_results
+
+if __name__ == "__main__":
+    main()
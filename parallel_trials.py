@@ -0,0 +1,86 @@
+import random
+
+from random_streams import RandomStream
+
+# Shards handed to each worker; more than one keeps workers busy when some
+# shards run long.
+SHARDS_PER_WORKER = 4
+
+
+def trial_rng(seed, trial_index, restart=0):
+    """Independent random stream for one trial, derived from a master seed.
+
+    Streams depend only on (seed, trial_index), never on which worker runs the
+    trial, so results are identical for any number of workers, and any one
+    trial can be replayed on its own. Integers are drawn in blocks (see
+    `random_streams.RandomStream`). Each `restart` of a trial after the first
+    gets a stream of its own, so a restarted walk does not depend on how
+    long the walks before it ran.
+    """
+    if restart:
+        return RandomStream(f"{seed}:{trial_index}:{restart}")
+    return RandomStream(f"{seed}:{trial_index}")
+
+
+def shard_ranges(num_trials, num_shards):
+    """Split range(num_trials) into up to `num_shards` contiguous (start, stop) ranges."""
+    num_shards = max(1, min(num_shards, num_trials))
+    size, extra = divmod(num_trials, num_shards)
+    ranges = []
+    start = 0
+    for shard in range(num_shards):
+        stop = start + size + (1 if shard < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def merge_counters(partials):
+    """Merge per-shard counter dicts.
+
+    Numbers are summed, lists concatenated and accumulators with a `merge`
+    method (such as `trial_metrics.TrialMetrics`) merged. Partials must be
+    given in shard order so concatenated lists stay in trial order.
+    """
+    merged = {}
+    for partial in partials:
+        for key, value in partial.items():
+            if key not in merged:
+                merged[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                merged[key].extend(value)
+            elif hasattr(value, 'merge'):
+                merged[key].merge(value)
+            else:
+                merged[key] += value
+    return merged
+
+
+def run_trials(trial_fn, num_trials, workers=1, seed=None, *args):
+    """Run `trial_fn(start, stop, seed, *args)` over all trials and merge the counters.
+
+    `trial_fn` must be a module-level function returning a counter dict for
+    trials [start, stop). With `workers > 1` the trials are sharded across a
+    process pool. A missing seed is drawn from the global generator, so every
+    trial still gets its own block-drawn stream from `trial_rng`, and a given
+    seed yields the same counters for any number of workers unless trials hit
+    a wall-clock limit. Trial functions called directly without a seed draw
+    from the global random module instead.
+    """
+    return run_trial_range(trial_fn, 0, num_trials, workers, seed, *args)
+
+
+def run_trial_range(trial_fn, start, stop, workers=1, seed=None, *args):
+    """`run_trials` for trials [start, stop) only, e.g. one batch of a longer run."""
+    if seed is None:
+        seed = random.getrandbits(64)
+    if workers is None or workers <= 1 or stop - start <= 1:
+        return trial_fn(start, stop, seed, *args)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = shard_ranges(stop - start, workers * SHARDS_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(trial_fn, start + shard_start, start + shard_stop, seed, *args)
+                   for shard_start, shard_stop in ranges]
+        return merge_counters(future.result() for future in futures)
@@ -0,0 +1,191 @@
+"""Parameter sweeps that run each trial's trajectory once for every limit.
+
+A smaller step or sideways limit only truncates the same walk, so a sweep
+walks each trial to the largest limit, records the step at which it first
+lands on a solution, and derives every limit's outcome from that step:
+
+    python queens_cli.py sweep random-walk --sideways-limits 10 20 50 100
+
+Rows use the same columns as the per-limit drivers, prefixed by the limits.
+"""
+import random
+
+import kernels
+from parallel_trials import run_trials, trial_rng
+from queens_evaluator import BoardEvaluator
+from random_streams import int_stream, random_board
+from reporting import print_results
+
+RANDOM_WALK_COLUMNS = ('Success Rate (%)', 'Stuck Rate (%)', 'Avg Steps (Success)', 'Avg Steps (Stuck)',
+                       'Avg Sideways Moves (Success)', 'Avg Sideways Moves (Stuck)')
+RESTART_COLUMNS = ('Success (%)', 'Stuck Probability (%)', 'Avg Steps (Successful)', 'Avg Steps (Stuck)',
+                   'Avg Restarts', 'Avg Evaluations')
+
+
+class LimitTotals:
+    """Per-limit sums, one list entry per limit, merged elementwise across shards."""
+
+    def __init__(self, names, size):
+        self.totals = {name: [0] * size for name in names}
+
+    def __getitem__(self, name):
+        return self.totals[name]
+
+    def merge(self, other):
+        for name, values in other.totals.items():
+            totals = self.totals[name]
+            for index, value in enumerate(values):
+                totals[index] += value
+        return self
+
+
+def walk_length(max_no_improvement_steps, sideways_limit):
+    """Moves after which `random_walk_hill_climbing.random_walk_hill_climb` gives up unsolved."""
+    return max(0, min(max_no_improvement_steps, max(sideways_limit, 1)))
+
+
+def hit_step(board, horizon, rng=random):
+    """Move on which a pure random walk from `board` first lands on a solution.
+
+    Returns None if that takes more than `horizon` moves. The walk runs as a
+    compiled kernel when `kernels` has one.
+    """
+    evaluator = BoardEvaluator(board)
+    moves = int_stream(rng, evaluator.neighbor_count())
+    if kernels.compiled():
+        return kernels.walk_hit_step(evaluator, moves, horizon)
+    max_pairs = evaluator.max_pairs
+    for step in range(1, horizon + 1):
+        if evaluator.apply_move_at(next(moves)) == max_pairs:
+            return step
+    return None
+
+
+def random_walk_sweep_trials(start, stop, seed, lengths, n=8):
+    """Walk trials [start, stop) once and total the outcome for every walk length."""
+    totals = LimitTotals(('successes', 'success_steps', 'stuck_steps'), len(lengths))
+    successes = totals['successes']
+    success_steps = totals['success_steps']
+    stuck_steps = totals['stuck_steps']
+    horizon = max(lengths)
+    for trial in range(start, stop):
+        rng = random if seed is None else trial_rng(seed, trial)
+        board = random_board(n, rng)
+        step = hit_step(board, horizon, rng)
+        start_solved = lengths[0] == 0 and BoardEvaluator(board).is_solution()
+        for index, length in enumerate(lengths):
+            # With no moves allowed the start board is returned as it is.
+            if step is not None and step <= length or length == 0 and start_solved:
+                successes[index] += 1
+                success_steps[index] += step if length else 0
+            else:
+                stuck_steps[index] += length
+    return {'trials': stop - start, 'totals': totals}
+
+
+def random_walk_sweep(num_trials, max_no_improvement_steps_values, sideways_limits, n=8, workers=1, seed=None):
+    """`simulate_random_walk` results for every limit pair from one walk per trial.
+
+    Returns rows of [max_no_improvement_steps, sideways_limit] followed by
+    the six `simulate_random_walk` columns. All pairs share the same trials,
+    so differences between rows are not blurred by sampling noise. With a
+    seed, each row matches `simulate_random_walk` run with the same seed.
+    """
+    pairs = [(steps, limit) for steps in max_no_improvement_steps_values for limit in sideways_limits]
+    lengths = sorted({walk_length(steps, limit) for steps, limit in pairs})
+    counters = run_trials(random_walk_sweep_trials, num_trials, workers, seed, lengths, n)
+    totals = counters['totals']
+
+    rows = []
+    for steps, limit in pairs:
+        length = walk_length(steps, limit)
+        index = lengths.index(length)
+        successes = totals['successes'][index]
+        stuck = num_trials - successes
+        avg_success_steps = totals['success_steps'][index] / successes if successes else 0
+        avg_stuck_steps = totals['stuck_steps'][index] / stuck if stuck else 0
+        # A walk makes one sideways move per unsolved step, so a success
+        # makes one fewer than its steps and a stuck walk one per step.
+        rows.append([steps, limit,
+                     successes * 100 / num_trials, stuck * 100 / num_trials,
+                     avg_success_steps, avg_stuck_steps,
+                     max(avg_success_steps - 1, 0) if successes else 0, avg_stuck_steps])
+    return rows
+
+
+def restart_sweep_trials(start, stop, seed, restart_after_steps_values, n=8, schedule='fixed'):
+    """Walk trials [start, stop) once and total the outcome for every base cutoff.
+
+    Walk k of a trial draws from its own `trial_rng(seed, trial, k)` stream,
+    as in `hill_climb_random_restart.restart_trials`, so it is the same walk
+    under every cutoff. It runs once, to the longest cutoff any value still
+    needs, and its hit step settles every value at once.
+    """
+    from restart_schedules import make_schedule
+
+    schedules = [make_schedule(schedule, value) for value in restart_after_steps_values]
+    totals = LimitTotals(('steps', 'restarts'), len(schedules))
+    steps = totals['steps']
+    restarts = totals['restarts']
+    for trial in range(start, stop):
+        for trial_schedule in schedules:
+            trial_schedule.start_trial()
+        pending = range(len(schedules))
+        restart = 0
+        while pending:
+            rng = random if seed is None else trial_rng(seed, trial, restart)
+            board = random_board(n, rng)
+            cutoffs = [schedules[index].next_cutoff() for index in pending]
+            # Like the driver, a fresh board that is already solved needs no walk
+            step = 0 if BoardEvaluator(board).is_solution() else hit_step(board, max(cutoffs), rng)
+            still_pending = []
+            for index, cutoff in zip(pending, cutoffs):
+                if step is not None and step <= cutoff:
+                    steps[index] += step
+                else:
+                    steps[index] += cutoff
+                    restarts[index] += 1
+                    still_pending.append(index)
+            pending = still_pending
+            restart += 1
+    return {'trials': stop - start, 'totals': totals}
+
+
+def restart_sweep(num_trials, restart_after_steps_values, n=8, workers=1, seed=None, schedule='fixed'):
+    """Restart-driver results for every base cutoff from one set of walks.
+
+    `schedule` is 'fixed', 'geometric' or 'luby'; the other schedules' cutoffs
+    do not depend on the base cutoff alone. Without a time limit every trial
+    solves, so the stuck columns are zero. With a seed, each row matches
+    `random_restart_hill_climb_fixed_steps` run with the same seed and
+    schedule. Returns rows of [restart_after_steps] followed by
+    `RESTART_COLUMNS`.
+    """
+    if schedule not in ('fixed', 'geometric', 'luby'):
+        raise ValueError(f"Cannot sweep the {schedule!r} restart schedule")
+    counters = run_trials(restart_sweep_trials, num_trials, workers, seed, list(restart_after_steps_values), n,
+                          schedule)
+    totals = counters['totals']
+    rows = []
+    for index, restart_after_steps in enumerate(restart_after_steps_values):
+        avg_steps = totals['steps'][index] / num_trials
+        rows.append([restart_after_steps, 100.0, 0.0, avg_steps, 0, totals['restarts'][index] / num_trials,
+                     avg_steps])
+    return rows
+
+
+def main(driver='random-walk', num_trials=1000, max_no_improvement_steps_values=(200,), sideways_limits=(100,),
+         restart_after_steps_values=(500,), n=8, workers=1, seed=None, output='table', schedule='fixed'):
+    """Run one sweep and print a row per parameter combination."""
+    if driver == 'random-walk':
+        rows = random_walk_sweep(num_trials, max_no_improvement_steps_values, sideways_limits, n, workers, seed)
+        columns = ['Max No-Improvement Steps', 'Sideways Moves Limit'] + list(RANDOM_WALK_COLUMNS)
+    else:
+        rows = restart_sweep(num_trials, restart_after_steps_values, n, workers, seed, schedule)
+        columns = ['Restart After Steps'] + list(RESTART_COLUMNS)
+    print_results(rows, columns, output)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
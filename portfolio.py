@@ -0,0 +1,190 @@
+"""Race several strategies on one board; the first solution wins.
+
+Each entry of a portfolio is a strategy run in its own worker process with
+its own random stream. All entries share one cancellation event through a
+`multiprocessing.Manager`: the first entry to solve the board sets it, and
+the others stop at their next deadline check, at most `CHECK_INTERVAL`
+neighbor evaluations later.
+
+    result = solve_portfolio([0] * 8, ['random_walk', 'single_neighbor', 'hill_climb'], time_limit=5)
+    result['winner'], result['board']
+
+Strategies that can get stuck start over from a fresh random board until
+the race ends, so every entry keeps looking for a solution. Which entry
+wins depends on timing; a `seed` fixes what each entry does, not the race.
+"""
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Manager
+
+from deadlines import CancellationToken, Deadline
+from parallel_trials import trial_rng
+from random_streams import random_board
+
+# Limits per attempt, as in the drivers each strategy comes from.
+WALK_NO_IMPROVEMENT_STEPS = 750
+SINGLE_NEIGHBOR_STEPS = 200
+SINGLE_NEIGHBOR_SIDEWAYS_LIMIT = 100
+TIME_LIMIT_TRY_STEPS = 1000
+STRATEGIES = ('hill_climb', 'random_walk', 'single_neighbor', 'time_limit')
+# Entries raced when none are given: every strategy once.
+DEFAULT_PORTFOLIO = STRATEGIES
+
+
+def _attempt(strategy, board, rng, deadline):
+    """One attempt of `strategy` from `board`; returns (board, safe_pairs, steps)."""
+    if strategy == 'hill_climb':
+        from n_queens_hill_climbing import perform_hill_climb
+        return perform_hill_climb(board, deadline)
+    if strategy == 'random_walk':
+        from hill_climb_random_restart import random_walk_hill_climb
+        final_board, safe_pairs, steps, _, _, _ = random_walk_hill_climb(board, WALK_NO_IMPROVEMENT_STEPS, rng,
+                                                                         deadline)
+        return final_board, safe_pairs, steps
+    if strategy == 'single_neighbor':
+        from random_walk_hill_climbing import random_walk_hill_climb
+        final_board, safe_pairs, steps, _ = random_walk_hill_climb(board, SINGLE_NEIGHBOR_STEPS,
+                                                                   SINGLE_NEIGHBOR_SIDEWAYS_LIMIT, deadline, rng=rng)
+        return final_board, safe_pairs, steps
+    from safe_queen_pairs import hill_climbing_with_random_walk
+    final_board, safe_pairs, steps, _ = hill_climbing_with_random_walk(board, TIME_LIMIT_TRY_STEPS, rng, deadline)
+    return final_board, safe_pairs, steps
+
+
+def run_strategy(strategy, board, seed, entry, deadline):
+    """Run one portfolio entry until it solves the board or `deadline` expires.
+
+    The entry draws from `trial_rng(seed, entry)`. When an attempt gets
+    stuck, 'hill_climb', 'random_walk' and 'single_neighbor' restart from a
+    random board drawn from `trial_rng(seed, entry, restart)`; 'time_limit'
+    retries from its start board, as in `safe_queen_pairs`.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy!r}")
+    n = len(board)
+    max_pairs = n * (n - 1) // 2
+    rng = trial_rng(seed, entry)
+    start_board = list(board)
+    best_board = start_board
+    best_safe_pairs = -1
+    steps = 0
+    restarts = 0
+    start = time.perf_counter()
+    while True:
+        final_board, safe_pairs, attempt_steps = _attempt(strategy, list(board), rng, deadline)
+        steps += attempt_steps
+        if safe_pairs > best_safe_pairs:
+            best_board = list(final_board)
+            best_safe_pairs = safe_pairs
+        # Polls the clock and token at the deadline's cadence, not per attempt
+        if safe_pairs == max_pairs or deadline.expired():
+            break
+        restarts += 1
+        if strategy != 'time_limit':
+            rng = trial_rng(seed, entry, restarts)
+            board = random_board(n, rng)
+    return {'strategy': strategy, 'entry': entry, 'solved': best_safe_pairs == max_pairs, 'board': best_board,
+            'safe_pairs': best_safe_pairs, 'steps': steps, 'restarts': restarts,
+            'seconds': time.perf_counter() - start, 'stopped': deadline.reason}
+
+
+def _race_entry(strategy, board, seed, entry, time_limit, event):
+    token = CancellationToken(event)
+    result = run_strategy(strategy, board, seed, entry, Deadline(time_limit, token=token))
+    if result['solved']:
+        token.cancel()
+    return result
+
+
+def solve_portfolio(board, strategies=DEFAULT_PORTFOLIO, workers=None, time_limit=None, seed=None):
+    """Race `strategies` on `board` and return the first solution found.
+
+    Naming a strategy more than once races it with several random streams.
+    Entries run in up to `workers` processes (default: one per entry, at
+    most one per CPU); with `workers=1` they run one after another in this
+    process. The race ends at the first solution or after `time_limit`
+    seconds.
+
+    Returns a dict with 'solved', the 'winner' strategy and its 'entry'
+    index (None if nothing solved), the winner's 'board' (or the best board
+    found), 'seconds' until the race was decided, and 'runs', one result
+    dict per entry that started (see `run_strategy`).
+    """
+    strategies = list(strategies)
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy!r}")
+    if seed is None:
+        seed = random.getrandbits(64)
+    workers = workers or min(len(strategies), os.cpu_count() or 1)
+    start = time.perf_counter()
+    runs = []
+    winner = None
+
+    if workers <= 1:
+        token = CancellationToken()
+        deadline = Deadline(time_limit, token=token)
+        for entry, strategy in enumerate(strategies):
+            if deadline.check():
+                break
+            result = run_strategy(strategy, board, seed, entry, deadline)
+            runs.append(result)
+            if result['solved']:
+                winner = result
+                token.cancel()
+        seconds = time.perf_counter() - start
+    else:
+        with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+            event = manager.Event()
+            pending = {executor.submit(_race_entry, strategy, board, seed, entry, time_limit, event)
+                       for entry, strategy in enumerate(strategies)}
+            seconds = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    result = future.result()
+                    runs.append(result)
+                    if result['solved'] and winner is None:
+                        winner = result
+                        seconds = time.perf_counter() - start
+                        event.set()
+                        # Entries still queued would only see the event and stop.
+                        for other in pending:
+                            other.cancel()
+            if seconds is None:
+                seconds = time.perf_counter() - start
+        runs.sort(key=lambda run: run['entry'])
+
+    best = winner or max(runs, key=lambda run: run['safe_pairs'], default=None)
+    return {'solved': winner is not None, 'winner': winner and winner['strategy'],
+            'entry': winner and winner['entry'], 'board': best and best['board'], 'seconds': seconds,
+            'seed': seed, 'runs': runs}
+
+
+def main(n=8, board=None, strategies=DEFAULT_PORTFOLIO, workers=None, time_limit=None, seed=None, output='table'):
+    """Race a portfolio on `board` (default: a random board) and print the outcome."""
+    if board is None:
+        board = random_board(n, random.Random(seed))
+    result = solve_portfolio(board, strategies, workers, time_limit, seed)
+    if output == 'json':
+        print(json.dumps(result))
+        return result
+    print(f"Start board: {board}")
+    if result['solved']:
+        print(f"Winner: {result['winner']} (entry {result['entry']}) after {result['seconds']:.3f} s")
+        print(f"Solution: {result['board']}")
+    else:
+        print(f"No solution within the time limit; best board: {result['board']}")
+    for run in result['runs']:
+        print(f"  {run['entry']:>2} {run['strategy']:<16} solved={run['solved']} steps={run['steps']} "
+              f"restarts={run['restarts']} stopped={run['stopped']}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
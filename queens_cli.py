@@ -0,0 +1,227 @@
+"""Command-line entry point for the n-queens climbers.
+
+Each subcommand imports only the module it runs, so starting the CLI stays
+cheap; pandas is loaded only for table output.
+
+    python queens_cli.py hill-climb --trials 1000
+    python queens_cli.py restart --trials 10000 --workers 4 --seed 1
+    python queens_cli.py random-walk --sideways-limits 50 100 200 --output json
+    python queens_cli.py restart --trials 100000 --precision 0.005
+    python queens_cli.py sweep random-walk --max-no-improvement-steps 100 200 --sideways-limits 10 50 100
+    python queens_cli.py restart --trials 1000000 --seed 1 --listen 0.0.0.0:8766 --local-workers 2
+    python queens_cli.py worker --connect coordinator-host:8766 --processes 8
+    python queens_cli.py portfolio -n 30 --strategies random_walk random_walk single_neighbor --time-limit 10
+"""
+import argparse
+import sys
+
+
+def _precision(args):
+    """PrecisionTarget for --precision/--confidence, or None for a fixed trial count."""
+    if args.precision is None:
+        return None
+    from sequential_stopping import PrecisionTarget
+    return PrecisionTarget(args.precision, args.precision, args.confidence)
+
+
+def _coordinator(args):
+    """distributed_trials.Coordinator for --listen, or None to run locally."""
+    if args.listen is None:
+        return None
+    from distributed_trials import Coordinator, parse_address
+    return Coordinator(parse_address(args.listen, '0.0.0.0'), args.authkey.encode(), args.local_workers)
+
+
+def _hill_climb(args):
+    from n_queens_hill_climbing import main
+    main(args.trials, args.n, args.batch, args.basin_map, _precision(args), args.seed, _coordinator(args))
+
+
+def _restart(args):
+    from hill_climb_random_restart import main
+    main(args.trials, args.max_no_improvement_steps, args.restart_after_steps, args.n,
+         args.workers, args.seed, args.output, _precision(args), args.checkpoint, args.resume, args.schedule,
+         _coordinator(args))
+
+
+def _restart_climb(args):
+    from random_restart_hill_climbing_fixed_steps import main
+    main(args.trials, args.max_no_improvement_steps, args.restart_after_steps, args.n,
+         args.workers, args.seed, args.output, _precision(args), args.checkpoint, args.resume, args.schedule)
+
+
+def _random_walk(args):
+    from random_walk_hill_climbing import main
+    main(args.trials, args.max_no_improvement_steps, args.sideways_limits, args.n, args.batch, args.output,
+         _precision(args), args.exact, args.memory)
+
+
+def _time_limit(args):
+    from safe_queen_pairs import main
+    main(args.trials, args.time_limit, args.n, args.workers, args.seed, args.output, _precision(args), args.checkpoint,
+         args.resume)
+
+
+def _sweep(args):
+    from parameter_sweep import main
+    main(args.driver, args.trials, args.max_no_improvement_steps, args.sideways_limits, args.restart_after_steps,
+         args.n, args.workers, args.seed, args.output, args.schedule)
+
+
+def _portfolio(args):
+    from portfolio import main
+    main(args.n, args.board, args.strategies, args.workers, args.time_limit, args.seed, args.output)
+
+
+def _large_n(args):
+    import random
+    import time
+
+    from min_conflicts import solve_large_n
+    start = time.perf_counter()
+    _, safe_pairs, steps = solve_large_n(args.n, args.strategy, rng=random.Random(args.seed))
+    solved = safe_pairs == args.n * (args.n - 1) // 2
+    print(f"n={args.n} solved={solved} steps={steps} seconds={time.perf_counter() - start:.2f}")
+
+
+def _worker(args):
+    from distributed_trials import main
+    return main(['--connect', args.connect, '--authkey', args.authkey, '--processes', str(args.processes)])
+
+
+def _serve(args):
+    from solve_service import main
+    return main(['--host', args.host, '--port', str(args.port)]
+                + (['--workers', str(args.workers)] if args.workers else []))
+
+
+def _benchmark(args):
+    from benchmarks import main
+    return main(args.benchmark_args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='queens_cli.py', description="Run the n-queens hill-climbing experiments.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_common(subparser, trials, batch=False, parallel=False, output=True):
+        subparser.add_argument('--trials', type=int, default=trials,
+                               help=f"number of trials, or the most to run with --precision (default: {trials})")
+        subparser.add_argument('-n', type=int, default=8, help="board size (default: 8)")
+        subparser.add_argument('--precision', type=float, metavar='WIDTH',
+                               help="stop once the success rate is within +/-WIDTH and mean steps within "
+                                    "+/-WIDTH relative (e.g. 0.005)")
+        subparser.add_argument('--confidence', type=float, default=0.95,
+                               help="confidence level for --precision (default: 0.95)")
+        if batch:
+            subparser.add_argument('--batch', action='store_true', help="run all trials in lockstep with NumPy")
+        if parallel:
+            subparser.add_argument('--workers', type=int, default=1, help="worker processes (default: 1)")
+            subparser.add_argument('--seed', type=int, help="master seed for reproducible runs")
+            subparser.add_argument('--checkpoint', metavar='PATH', help="save progress to PATH every few trials")
+            subparser.add_argument('--resume', action='store_true', help="continue the run saved in --checkpoint")
+        if output:
+            subparser.add_argument('--output', choices=('table', 'json'), default='table',
+                                   help="table (needs pandas) or JSON lines")
+
+    def add_distributed(subparser):
+        subparser.add_argument('--listen', metavar='[HOST:]PORT',
+                               help="coordinate the trials for remote workers connecting here")
+        subparser.add_argument('--local-workers', type=int, default=0,
+                               help="with --listen, worker processes to start on this machine (default: 0)")
+        subparser.add_argument('--authkey', default='n-queens', help="shared secret for --listen and workers")
+
+    hill_climb = subparsers.add_parser('hill-climb', help="steepest-ascent hill climbing")
+    add_common(hill_climb, 1000, batch=True, output=False)
+    hill_climb.add_argument('--basin-map', help="exact results from a basin map table")
+    hill_climb.add_argument('--seed', type=int, help="master seed for reproducible runs")
+    add_distributed(hill_climb)
+    hill_climb.set_defaults(handler=_hill_climb)
+
+    for name, handler, help_text in (
+            ('restart', _restart, "random-restart hill climbing with fixed steps"),
+            ('restart-climb', _restart_climb, "random-restart climbing (random_restart_climb_fixed)")):
+        restart = subparsers.add_parser(name, help=help_text)
+        add_common(restart, 10000, parallel=True)
+        restart.add_argument('--max-no-improvement-steps', type=int, default=750)
+        restart.add_argument('--restart-after-steps', type=int, default=500,
+                             help="step cutoff, or base cutoff for --schedule (default: 500)")
+        restart.add_argument('--schedule', choices=('none', 'fixed', 'geometric', 'luby', 'adaptive'),
+                             default='fixed', help="restart schedule (default: fixed)")
+        if name == 'restart':
+            add_distributed(restart)
+        restart.set_defaults(handler=handler)
+
+    random_walk = subparsers.add_parser('random-walk', help="random-walk hill climbing with sideways limits")
+    add_common(random_walk, 1000, batch=True)
+    random_walk.add_argument('--max-no-improvement-steps', type=int, default=200)
+    random_walk.add_argument('--sideways-limits', type=int, nargs='+', default=[100])
+    random_walk.add_argument('--exact', action='store_true',
+                             help="compute exact results from the walk's Markov chain (n <= 8)")
+    random_walk.add_argument('--memory', action='store_true',
+                             help="avoid recently visited boards and undoing recent moves (see transposition.py)")
+    random_walk.set_defaults(handler=_random_walk)
+
+    time_limit = subparsers.add_parser('time-limit', help="random restarts with a time limit per try")
+    add_common(time_limit, 100, parallel=True)
+    time_limit.add_argument('--time-limit', type=float, default=60, help="seconds per try (default: 60)")
+    time_limit.set_defaults(handler=_time_limit)
+
+    sweep = subparsers.add_parser('sweep', help="results for many limits from one trajectory per trial")
+    sweep.add_argument('driver', choices=('random-walk', 'restart'))
+    sweep.add_argument('--trials', type=int, default=1000, help="number of trials (default: 1000)")
+    sweep.add_argument('-n', type=int, default=8, help="board size (default: 8)")
+    sweep.add_argument('--max-no-improvement-steps', type=int, nargs='+', default=[200])
+    sweep.add_argument('--sideways-limits', type=int, nargs='+', default=[100])
+    sweep.add_argument('--restart-after-steps', type=int, nargs='+', default=[500])
+    sweep.add_argument('--schedule', choices=('fixed', 'geometric', 'luby'), default='fixed',
+                       help="restart schedule for the restart sweep (default: fixed)")
+    sweep.add_argument('--workers', type=int, default=1, help="worker processes (default: 1)")
+    sweep.add_argument('--seed', type=int, help="master seed for reproducible runs")
+    sweep.add_argument('--output', choices=('table', 'json'), default='table', help="table (needs pandas) or JSON lines")
+    sweep.set_defaults(handler=_sweep)
+
+    portfolio = subparsers.add_parser('portfolio', help="race several strategies on one board, first solution wins")
+    portfolio.add_argument('-n', type=int, default=8, help="board size (default: 8)")
+    portfolio.add_argument('--board', type=int, nargs='+', help="start board, one row per column (default: random)")
+    portfolio.add_argument('--strategies', nargs='+', default=['hill_climb', 'random_walk', 'single_neighbor', 'time_limit'],
+                           choices=('hill_climb', 'random_walk', 'single_neighbor', 'time_limit'),
+                           help="entries to race; repeat a strategy to race several seeds (default: one of each)")
+    portfolio.add_argument('--workers', type=int, help="worker processes (default: one per entry, up to the CPUs)")
+    portfolio.add_argument('--time-limit', type=float, help="give up after this many seconds")
+    portfolio.add_argument('--seed', type=int, help="master seed for the entries' random streams")
+    portfolio.add_argument('--output', choices=('table', 'json'), default='table', help="summary or one JSON line")
+    portfolio.set_defaults(handler=_portfolio)
+
+    large_n = subparsers.add_parser('large-n', help="min-conflicts solver for large boards")
+    large_n.add_argument('-n', type=int, default=1000000, help="board size (default: 1000000)")
+    large_n.add_argument('--strategy', choices=('hill_climb', 'random_walk'), default='hill_climb')
+    large_n.add_argument('--seed', type=int)
+    large_n.set_defaults(handler=_large_n)
+
+    worker = subparsers.add_parser('worker', help="run trials for a --listen coordinator (see distributed_trials.py)")
+    worker.add_argument('--connect', required=True, metavar='HOST:PORT', help="coordinator address")
+    worker.add_argument('--processes', type=int, default=1, help="worker processes to run here (default: 1)")
+    worker.add_argument('--authkey', default='n-queens', help="shared secret of the coordinator")
+    worker.set_defaults(handler=_worker)
+
+    serve = subparsers.add_parser('serve', help="JSON-lines solve service over TCP (see solve_service.py)")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    serve.set_defaults(handler=_serve)
+
+    benchmark = subparsers.add_parser('benchmark', help="benchmark suite (see benchmarks.py --help)")
+    benchmark.add_argument('benchmark_args', nargs=argparse.REMAINDER)
+    benchmark.set_defaults(handler=_benchmark)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+def attacking_line_pairs(count):
+    """Number of attacking pairs among `count` queens sharing one line."""
+    return count * (count - 1) // 2
+
+
+def pack_board(board):
+    """Pack a board into one integer (row of column c is digit c in base n).
+
+    For 8 queens this is the 24-bit integer with 3 bits per column.
+    """
+    n = len(board)
+    key = 0
+    for row in reversed(board):
+        key = key * n + row
+    return key
+
+
+def unpack_board(key, n=8):
+    """Inverse of `pack_board`."""
+    board = []
+    for _ in range(n):
+        key, row = divmod(key, n)
+        board.append(row)
+    return board
+
+
+# Symmetries that keep one queen per column, as (reverse_columns, flip_rows).
+# Each is its own inverse. Rotations are left out: they only map boards to
+# boards when every row holds exactly one queen.
+BOARD_SYMMETRIES = ((False, False), (True, False), (False, True), (True, True))
+
+
+def transform_board(board, symmetry):
+    """Apply one of `BOARD_SYMMETRIES` to a board."""
+    reverse_columns, flip_rows = symmetry
+    n = len(board)
+    board = list(reversed(board)) if reverse_columns else list(board)
+    return [n - 1 - row for row in board] if flip_rows else board
+
+
+def canonical_board(board):
+    """Return (canonical board, symmetry) with the smallest packed key.
+
+    Symmetric boards share one canonical form, and
+    `transform_board(canonical, symmetry)` gives back the original board.
+    Attack counts are symmetry-invariant, so a solution found for the
+    canonical board maps back to a solution for the original.
+    """
+    return min(((transform_board(board, symmetry), symmetry) for symmetry in BOARD_SYMMETRIES),
+               key=lambda candidate: pack_board(candidate[0]))
+
+
+class BoardEvaluator:
+    """Track row and diagonal occupancy so single-queen moves score in O(1).
+
+    The board holds one queen per column; `board[col]` is that queen's row.
+    `safe_pairs` always equals the pairwise count of non-attacking pairs and
+    `key` the board's `pack_board` integer, both updated in place by moves,
+    so climbers never copy the board while walking. The key is only tracked
+    once it is first read, so climbers that never read it, like steepest
+    ascent on large boards, do not pay for the big-integer updates.
+    """
+
+    __slots__ = ('board', 'n', 'max_pairs', 'rows', 'diagonals', 'anti_diagonals', 'safe_pairs', 'powers',
+                 '_key')
+
+    def __init__(self, board):
+        self.board = list(board)
+        self.n = n = len(self.board)
+        self.max_pairs = n * (n - 1) // 2
+        self.powers = None
+        self._key = None
+        self.rows = [0] * n
+        self.diagonals = [0] * (2 * n - 1)       # indexed by row - col + n - 1
+        self.anti_diagonals = [0] * (2 * n - 1)  # indexed by row + col
+        for col, row in enumerate(self.board):
+            self.rows[row] += 1
+            self.diagonals[row - col + n - 1] += 1
+            self.anti_diagonals[row + col] += 1
+
+        attacking_pairs = 0
+        for line in (self.rows, self.diagonals, self.anti_diagonals):
+            for count in line:
+                attacking_pairs += attacking_line_pairs(count)
+        self.safe_pairs = self.max_pairs - attacking_pairs
+
+    @property
+    def key(self):
+        """`pack_board` of the current board; packed once, then kept up to date."""
+        if self._key is None:
+            self.powers = [self.n ** col for col in range(self.n)]
+            self._key = pack_board(self.board)
+        return self._key
+
+    def is_solution(self):
+        """Return True when no two queens attack each other."""
+        return self.safe_pairs == self.max_pairs
+
+    def move_delta(self, col, row):
+        """Change in non-attacking pairs if the queen in `col` moves to `row`."""
+        old_row = self.board[col]
+        offset = self.n - 1 - col
+        # Lines through the old square lose this queen's attacks; the new
+        # square's lines gain one attack per queen already on them.
+        released = (self.rows[old_row] + self.diagonals[old_row + offset]
+                    + self.anti_diagonals[old_row + col] - 3)
+        gained = (self.rows[row] + self.diagonals[row + offset]
+                  + self.anti_diagonals[row + col])
+        return released - gained
+
+    def apply_move(self, col, row):
+        """Move the queen in `col` to `row`, updating counters in place."""
+        rows = self.rows
+        diagonals = self.diagonals
+        anti_diagonals = self.anti_diagonals
+        old_row = self.board[col]
+        offset = self.n - 1 - col
+        rows[old_row] -= 1
+        diagonals[old_row + offset] -= 1
+        anti_diagonals[old_row + col] -= 1
+        released = rows[old_row] + diagonals[old_row + offset] + anti_diagonals[old_row + col]
+        gained = rows[row] + diagonals[row + offset] + anti_diagonals[row + col]
+        rows[row] += 1
+        diagonals[row + offset] += 1
+        anti_diagonals[row + col] += 1
+        self.board[col] = row
+        if self._key is not None:
+            self._key += (row - old_row) * self.powers[col]
+        self.safe_pairs += released - gained
+        return self.safe_pairs
+
+    def apply_move_at(self, index):
+        """Apply the neighbor move numbered `index` (see `move_at`)."""
+        n_minus_one = self.n - 1
+        col = index // n_minus_one
+        row = index - col * n_minus_one
+        if row >= self.board[col]:
+            row += 1
+        return self.apply_move(col, row)
+
+    def neighbor_count(self):
+        """Number of boards reachable by moving a single queen."""
+        return self.n * (self.n - 1)
+
+    def move_at(self, index):
+        """Map a neighbor index to its (col, row) move.
+
+        Neighbors are ordered column by column, skipping each queen's current
+        row, which is the order the climbers used to build neighbor lists in.
+        """
+        col, row = divmod(index, self.n - 1)
+        if row >= self.board[col]:
+            row += 1
+        return col, row
+
+    def iter_neighbors(self):
+        """Yield (col, row, safe_pairs) for every neighbor without building boards.
+
+        Neighbors come in `move_at` order.
+        """
+        rows = self.rows
+        diagonals = self.diagonals
+        anti_diagonals = self.anti_diagonals
+        n = self.n
+        for col in range(n):
+            current_row = self.board[col]
+            offset = n - 1 - col
+            base = self.safe_pairs + (rows[current_row] + diagonals[current_row + offset]
+                                      + anti_diagonals[current_row + col] - 3)
+            for row in range(n):
+                if row != current_row:
+                    yield col, row, base - (rows[row] + diagonals[row + offset] + anti_diagonals[row + col])
+
+    def best_move(self):
+        """Return the first (col, row, delta) with the largest positive delta.
+
+        Returns None when no move improves the board.
+        """
+        rows = self.rows
+        diagonals = self.diagonals
+        anti_diagonals = self.anti_diagonals
+        n = self.n
+        best = None
+        best_delta = 0
+        for col in range(n):
+            current_row = self.board[col]
+            offset = n - 1 - col
+            released = (rows[current_row] + diagonals[current_row + offset]
+                        + anti_diagonals[current_row + col] - 3)
+            # A move can gain no less than zero attacks, so skip hopeless columns
+            if released <= best_delta:
+                continue
+            for row in range(n):
+                if row != current_row:
+                    delta = released - (rows[row] + diagonals[row + offset] + anti_diagonals[row + col])
+                    if delta > best_delta:
+                        best = (col, row, delta)
+                        best_delta = delta
+        return best
@@ -1,28 +1,48 @@
 import random
-import pandas as pd
 import time
+from contextlib import nullcontext
+
+from deadlines import Deadline
+from parallel_trials import run_trials, trial_rng
+from queens_evaluator import BoardEvaluator, unpack_board
+from random_streams import int_stream, random_board
+from reporting import print_intervals, print_results
+from trial_metrics import TrialMetrics, TrialRecordWriter
 
 def count_safe_pairs(board_state):
     """Calculate the number of non-attacking pairs of queens."""
-    max_safe_pairs = 28  # Max pairs for 8 queens (n * (n-1) / 2 where n = 8)
+    n = len(board_state)
+    max_safe_pairs = n * (n - 1) // 2  # Max pairs for n queens (n * (n-1) / 2)
     attacking_pairs = 0
     
-    for queen_a in range(8):
-        for queen_b in range(queen_a + 1, 8):
+    for queen_a in range(n):
+        for queen_b in range(queen_a + 1, n):
             # Check if queens are in the same row or on the same diagonal
             if board_state[queen_a] == board_state[queen_b] or abs(board_state[queen_a] - board_state[queen_b]) == abs(queen_a - queen_b):
                 attacking_pairs += 1
 
     return max_safe_pairs - attacking_pairs
 
-def generate_random_board():
-    """Generate a random state for 8 queens."""
-    return [random.randint(0, 7) for _ in range(8)]
+def generate_random_board(n=8, rng=random):
+    """Generate a random state for n queens."""
+    return random_board(n, rng)
+
+def random_walk_climb(board_state, max_no_improve_steps, rng=random, deadline=None, memory=None, instrument=None):
+    """Perform Random-Walk Hill Climbing with additional metrics.
 
-def random_walk_climb(board_state, max_no_improve_steps):
-    """Perform Random-Walk Hill Climbing with additional metrics."""
-    current_board = board_state
-    current_safe_pairs = count_safe_pairs(current_board)
+    Stops early when `deadline` expires and returns the best state seen.
+    With a `transposition.WalkMemory`, neighbors leading to recently visited
+    states or undoing recent moves are redrawn. `instrument` receives every
+    step when given.
+    """
+    evaluator = BoardEvaluator(board_state)
+    moves = int_stream(rng, evaluator.neighbor_count())
+    if memory is not None:
+        memory.start(evaluator)
+    if instrument is not None:
+        instrument.start_run('random_walk_climb', evaluator.safe_pairs)
+    best_safe_pairs = evaluator.safe_pairs
+    best_key = evaluator.key
     step_count = 0
     sideways_moves_count = 0
     local_minima_count = 0
@@ -30,19 +50,28 @@ def random_walk_climb(board_state, max_no_improve_steps):
     
     while True:
         step_count += 1
-        potential_neighbors = []
-        for col in range(8):
-            for row in range(8):
-                if current_board[col] != row:
-                    new_board = list(current_board)
-                    new_board[col] = row
-                    potential_neighbors.append((new_board, count_safe_pairs(new_board)))
-        
-        board_state, current_safe_pairs = random.choice(potential_neighbors)
+        # Pick a uniformly random neighbor and score it incrementally
+        if memory is None:
+            current_safe_pairs = evaluator.apply_move_at(next(moves))
+        else:
+            current_safe_pairs = memory.step(evaluator, rng)
+        if instrument is not None:
+            instrument.move(current_safe_pairs)
         
-        if current_safe_pairs == 28:
+        if current_safe_pairs == evaluator.max_pairs:
             elapsed_time = time.time() - start_time
-            return board_state, current_safe_pairs, step_count, sideways_moves_count, local_minima_count, elapsed_time
+            if instrument is not None:
+                instrument.end_run(True)
+            return evaluator.board, current_safe_pairs, step_count, sideways_moves_count, local_minima_count, elapsed_time
+        if current_safe_pairs > best_safe_pairs:
+            best_safe_pairs = current_safe_pairs
+            best_key = evaluator.key
+        if deadline is not None and deadline.expired(step_count):
+            elapsed_time = time.time() - start_time
+            if instrument is not None:
+                instrument.end_run(False)
+            return (unpack_board(best_key, evaluator.n), best_safe_pairs, step_count, sideways_moves_count,
+                    local_minima_count, elapsed_time)
         
         # Check for local minima
         if step_count > max_no_improve_steps:
@@ -50,65 +79,182 @@ def random_walk_climb(board_state, max_no_improve_steps):
         
         sideways_moves_count += 1
 
-def random_restart_climb_fixed(num_restarts, max_no_improve_steps, steps_before_restart):
-    """Perform Random-Restart Hill Climbing with fixed steps and additional metrics."""
+def restart_climb_trials(start, stop, seed, steps_before_restart, n=8, keep_steps=True, writer=None, time_limit=None,
+                         token=None, instrument=None, schedule='fixed'):
+    """Run restart trials [start, stop) for `parallel_trials.run_trials`.
+
+    Walks restart from a new random board at the cutoffs of `schedule`; the
+    other options are those of `random_restart_climb_fixed`.
+    """
+    from restart_schedules import make_schedule
+
+    schedule = make_schedule(schedule, steps_before_restart)
     total_successes = 0
     total_step_count = 0
+    total_restarts = 0
+    total_evaluations = 0
     total_time = 0
     all_step_counts = []
+    metrics = TrialMetrics()
     
-    for _ in range(num_restarts):
-        board_state = generate_random_board()
+    for trial in range(start, stop):
+        if token is not None and token.cancelled:
+            break
+        rng = random if seed is None else trial_rng(seed, trial)
+        board_state = generate_random_board(n, rng)
         step_count = 0
+        sideways_count = 0
+        restart_count = 0
+        trial_time = 0
+        deadline = Deadline(time_limit, token=token)
+        schedule.start_trial()
+        if instrument is not None:
+            instrument.start_run('restart_climb_trial', count_safe_pairs(board_state))
         while True:
-            final_board, final_safe_pairs, step_count, sideways_moves_count, local_minima_count, elapsed_time = random_walk_climb(board_state, steps_before_restart)
-            total_time += elapsed_time
-            all_step_counts.append(step_count)
-            
-            if final_safe_pairs == 28:
-                total_successes += 1
-                total_step_count += step_count
+            deadline.restart(schedule.next_cutoff())
+            if count_safe_pairs(board_state) == n * (n - 1) // 2:
+                # The new board is already solved, so there is nothing to walk
+                final_safe_pairs, walk_steps, sideways_moves_count, elapsed_time = n * (n - 1) // 2, 0, 0, 0
+            else:
+                final_board, final_safe_pairs, walk_steps, sideways_moves_count, local_minima_count, elapsed_time = random_walk_climb(board_state, steps_before_restart, rng, deadline, instrument=instrument)
+            step_count += walk_steps
+            sideways_count += sideways_moves_count
+            trial_time += elapsed_time
+            solved = final_safe_pairs == n * (n - 1) // 2
+            if solved or deadline.reason == 'steps':
+                schedule.observe(walk_steps, solved)
+            if solved or deadline.reason != 'steps':
                 break
+            # Reached the cutoff: restart from a new board on its own stream
+            restart_count += 1
+            if instrument is not None:
+                instrument.count('restarts')
+            rng = random if seed is None else trial_rng(seed, trial, restart_count)
+            board_state = generate_random_board(n, rng)
+
+        total_time += trial_time
+        total_restarts += restart_count
+        total_evaluations += step_count
+        metrics.add(solved, step_count, sideways_count)
+        if keep_steps:
+            all_step_counts.append(step_count)
+        if writer is not None:
+            writer.write(trial=trial, solved=solved, steps=step_count, sideways_moves=sideways_count, time=trial_time)
+        if solved:
+            total_successes += 1
+            total_step_count += step_count
+        if instrument is not None:
+            instrument.end_run(solved)
+    
+    return {
+        'total_successes': total_successes,
+        'total_step_count': total_step_count,
+        'restarts': total_restarts,
+        'evaluations': total_evaluations,
+        'total_time': total_time,
+        'all_step_counts': all_step_counts,
+        'metrics': metrics
+    }
+
+def random_restart_climb_fixed(num_restarts, max_no_improve_steps, steps_before_restart, n=8, workers=1, seed=None,
+                               keep_steps=True, record_path=None, time_limit=None, token=None, precision=None,
+                               instrument=None, checkpoint_path=None, resume=False, schedule='fixed'):
+    """Perform Random-Restart Hill Climbing with fixed steps and additional metrics.
+
+    Walks restart at the cutoffs of `schedule`, and a trial gives up after
+    `time_limit` seconds. The other options are those of
+    `hill_climb_random_restart.random_restart_hill_climb_fixed_steps`.
+    """
+    if record_path is not None and workers is not None and workers > 1:
+        raise ValueError("record_path is only supported with workers=1")
+    if checkpoint_path is not None and (record_path is not None or precision is not None):
+        raise ValueError("checkpoint_path cannot be combined with record_path or precision")
+    if instrument is not None and workers is not None and workers > 1:
+        raise ValueError("instrument is only supported with workers=1")
+    from restart_schedules import check_serial_schedule
+    check_serial_schedule(schedule, steps_before_restart, workers, checkpoint_path, precision)
+    args = (steps_before_restart, n, keep_steps)
+    with TrialRecordWriter(record_path) if record_path is not None else nullcontext() as writer:
+        if precision is not None:
+            from sequential_stopping import run_sequential
+            counters, intervals = run_sequential(restart_climb_trials, num_restarts, precision, workers, seed, *args,
+                                                 writer, time_limit, token, instrument, schedule)
+            num_restarts = intervals['trials']
+        elif checkpoint_path is not None:
+            from checkpoints import run_checkpointed
+            counters = run_checkpointed(restart_climb_trials, num_restarts, checkpoint_path, workers, seed, *args,
+                                        writer, time_limit, token, instrument, schedule,
+                                        params=args + (time_limit, repr(schedule)), resume=resume, token=token)
+        else:
+            counters = run_trials(restart_climb_trials, num_restarts, workers, seed, *args, writer, time_limit, token,
+                                  instrument, schedule)
+    total_successes = counters['total_successes']
+    total_step_count = counters['total_step_count']
+    total_time = counters['total_time']
+    all_step_counts = counters['all_step_counts'] if keep_steps else None
+    metrics = counters['metrics']
     
     avg_steps_for_success = total_step_count / total_successes if total_successes > 0 else 0
-    avg_steps_for_stuck = (num_restarts - total_successes) / num_restarts if num_restarts > 0 else 0
+    avg_steps_for_stuck = metrics.stuck_steps.mean
     avg_time = total_time / num_restarts if num_restarts > 0 else 0
     
-    return {
+    results = {
         'total_successes': total_successes,
         'total_step_count': total_step_count,
+        'restarts': counters['restarts'],
+        'total_evaluations': counters['evaluations'],
         'num_restarts': num_restarts,
         'avg_time': avg_time,
         'avg_steps_for_success': avg_steps_for_success,
         'avg_steps_for_stuck': avg_steps_for_stuck,
-        'all_step_counts': all_step_counts
+        'all_step_counts': all_step_counts,
+        'metrics': metrics
     }
+    if precision is not None:
+        results['intervals'] = intervals
+    return results
+
+def main(simulations=10000, max_no_improve_steps=750, restart_after_steps=500, n=8, workers=1, seed=None,
+         output='table', precision=None, checkpoint_path=None, resume=False, schedule='fixed'):
+    """Run Random-Restart Hill Climbing (Fixed Steps) simulation and print the results.
+
+    `simulations` is an upper bound when a `precision` target is given.
+    """
+    fixed_step_climb_results = random_restart_climb_fixed(simulations, max_no_improve_steps, restart_after_steps,
+                                                          n, workers, seed, keep_steps=False, precision=precision,
+                                                          checkpoint_path=checkpoint_path, resume=resume,
+                                                          schedule=schedule)
+    simulations = fixed_step_climb_results['num_restarts']
+
+    # Display results in tabular format
+    print_results(
+        [['Random-Restart Hill-Climbing (Fixed Steps)'] + [
+            fixed_step_climb_results['total_successes'] * 100 / simulations,  # Success (%)
+            (simulations - fixed_step_climb_results['total_successes']) * 100 / simulations,  # Stuck Probability (%)
+            fixed_step_climb_results['avg_steps_for_success'],  # Avg Steps (Successful)
+            fixed_step_climb_results['avg_steps_for_stuck'],  # Avg Steps (Stuck)
+            fixed_step_climb_results['restarts'] / simulations,  # Avg Restarts
+            fixed_step_climb_results['total_evaluations'] / simulations,  # Avg Evaluations
+        ]],
+        [
+            'Algorithm', 'Success (%)', 'Stuck Probability (%)', 
+            'Avg Steps (Successful)', 'Avg Steps (Stuck)', 'Avg Restarts', 'Avg Evaluations'
+        ],
+        output
+    )
+    if precision is not None:
+        print_intervals(fixed_step_climb_results['intervals'], output)
+    if output == 'json':
+        return fixed_step_climb_results
+
+    # Display additional details
+    print("\nDetailed Metrics:")
+    print(f"Total Successful Solutions: {fixed_step_climb_results['total_successes']}")
+    print(f"Total Restarts: {fixed_step_climb_results['restarts']}")
+    print(f"Total Evaluations: {fixed_step_climb_results['total_evaluations']}")
+    print(f"Total Steps Taken for All Solutions: {fixed_step_climb_results['metrics'].steps.total}")
+    print(f"Average Steps Taken for Each Solution: {fixed_step_climb_results['metrics'].steps.total / fixed_step_climb_results['total_successes'] if fixed_step_climb_results['total_successes'] > 0 else 0}")
+    return fixed_step_climb_results
 
-# Parameters
-simulations = 10000  
-max_no_improve_steps = 750
-restart_after_steps = 500
-
-# Run Random-Restart Hill Climbing (Fixed Steps) simulation
-fixed_step_climb_results = random_restart_climb_fixed(simulations, max_no_improve_steps, restart_after_steps)
-
-# Display results in tabular format
-fixed_step_climb_df = pd.DataFrame(
-    [['Random-Restart Hill-Climbing (Fixed Steps)'] + [
-        fixed_step_climb_results['total_successes'] * 100 / simulations,  # Success (%)
-        (simulations - fixed_step_climb_results['total_successes']) * 100 / simulations,  # Stuck Probability (%)
-        fixed_step_climb_results['avg_steps_for_success'],  # Avg Steps (Successful)
-        fixed_step_climb_results['avg_steps_for_stuck'],  # Avg Steps (Stuck)
-    ]],
-    columns=[
-        'Algorithm', 'Success (%)', 'Stuck Probability (%)', 
-        'Avg Steps (Successful)', 'Avg Steps (Stuck)'
-    ]
-)
-print(fixed_step_climb_df.to_string(index=False))
-
-# Display additional details
-print("\nDetailed Metrics:")
-print(f"Total Successful Solutions: {fixed_step_climb_results['total_successes']}")
-print(f"Total Steps Taken for All Solutions: {sum(fixed_step_climb_results['all_step_counts'])}")
-print(f"Average Steps Taken for Each Solution: {sum(fixed_step_climb_results['all_step_counts']) / fixed_step_climb_results['total_successes'] if fixed_step_climb_results['total_successes'] > 0 else 0}")
+if __name__ == "__main__":
+    main()
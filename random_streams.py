@@ -0,0 +1,110 @@
+"""Random integers drawn in blocks for the climbers' inner loops.
+
+`random.randrange` costs a few hundred nanoseconds per call in pure Python,
+a large share of a walk step. A RandomStream draws a whole block of values
+for a given bound at once, from `getrandbits` bytes or a NumPy Generator,
+and hands them out through a plain iterator:
+
+    moves = int_stream(rng, evaluator.neighbor_count())
+    evaluator.apply_move_at(next(moves))
+
+RandomStream subclasses `random.Random`, so it can be passed anywhere an
+`rng` is accepted, and a string seed such as "seed:trial" gives every
+trial its own replayable stream (see `parallel_trials.trial_rng`). Streams
+are reproducible for a given seed and backend; the two backends draw
+different values.
+"""
+import random
+from itertools import chain, repeat
+
+# Values drawn per block for each bound. Blocks start at FIRST_BLOCK_SIZE
+# and grow fourfold up to BLOCK_SIZE, so short-lived streams, such as one
+# per restart, do not pay for values they never use.
+FIRST_BLOCK_SIZE = 64
+BLOCK_SIZE = 4096
+BACKENDS = ('bits', 'numpy')
+
+
+class RandomStream(random.Random):
+    """`random.Random` with block-drawn `randrange` and `ints` iterators."""
+
+    def __init__(self, seed=None, backend='bits', block_size=BLOCK_SIZE):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend!r}")
+        self.backend = backend
+        self.block_size = block_size
+        super().__init__(seed)
+
+    def seed(self, *args, **kwargs):
+        super().seed(*args, **kwargs)
+        # Blocks drawn under the old seed must not leak into the new stream.
+        self._ints = {}
+        self._generator = None
+
+    def ints(self, bound):
+        """Endless iterator of uniform ints in range(bound).
+
+        Each bound keeps one iterator, so values left over from one walk are
+        used by the next rather than thrown away.
+        """
+        values = self._ints.get(bound)
+        if values is None:
+            if bound <= 0:
+                raise ValueError("empty range for ints()")
+            blocks = self._numpy_blocks(bound) if self.backend == 'numpy' else self._bit_blocks(bound)
+            values = self._ints[bound] = chain.from_iterable(blocks)
+        return values
+
+    def randrange(self, start, stop=None, step=1):
+        if stop is None and step == 1:
+            values = self._ints.get(start)
+            if values is not None:
+                return next(values)
+            if start.__class__ is int and start > 0:
+                return next(self.ints(start))
+        return super().randrange(start, stop, step)
+
+    def _block_sizes(self):
+        size = min(FIRST_BLOCK_SIZE, self.block_size)
+        while True:
+            yield size
+            size = min(size * 4, self.block_size)
+
+    def _bit_blocks(self, bound):
+        if bound > 1 << 16:
+            for size in self._block_sizes():
+                yield [self._randbelow(bound) for _ in range(size)]
+        width, code = (1, 'B') if bound <= 1 << 8 else (2, 'H')
+        span = 1 << 8 * width
+        # Values at or above `limit` would make the lowest residues more
+        # likely, so they are dropped.
+        limit = span - span % bound
+        for size in self._block_sizes():
+            data = memoryview(self.getrandbits(8 * width * size).to_bytes(width * size, 'little')).cast(code)
+            yield [value % bound for value in data if value < limit]
+
+    def _numpy_blocks(self, bound):
+        if self._generator is None:
+            import numpy as np
+            self._generator = np.random.default_rng(self.getrandbits(128))
+        generator = self._generator
+        for size in self._block_sizes():
+            yield generator.integers(0, bound, size=size).tolist()
+
+
+def int_stream(rng, bound):
+    """Iterator of uniform ints in range(bound) drawn from `rng`.
+
+    Uses the block iterator of a RandomStream; any other generator, including
+    the `random` module itself, is called once per value as before.
+    """
+    ints = getattr(rng, 'ints', None)
+    if ints is not None:
+        return ints(bound)
+    return map(rng.randrange, repeat(bound))
+
+
+def random_board(n=8, rng=random):
+    """Random board with one queen per column, drawn from `rng`."""
+    rows = int_stream(rng, n)
+    return [next(rows) for _ in range(n)]
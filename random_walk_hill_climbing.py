@@ -1,76 +1,138 @@
 import random
-import pandas as pd
+
+import kernels
+from parallel_trials import trial_rng
+from queens_evaluator import BoardEvaluator, unpack_board
+from random_streams import int_stream, random_board
+from reporting import print_intervals, print_results
+from trial_metrics import TrialMetrics
 
 def count_safe_queen_pairs(board):
     """Count the number of non-attacking pairs of queens."""
-    total_pairs = 28  # Max pairs for 8 queens (n * (n-1) / 2 where n = 8)
-    attacking_pairs = 0
-    
-    for i in range(8):
-        for j in range(i + 1, 8):
-            if board[i] == board[j] or abs(board[i] - board[j]) == abs(i - j):
-                attacking_pairs += 1
+    return kernels.count_safe_pairs(board)
 
-    return total_pairs - attacking_pairs
+def generate_random_board(n=8, rng=random):
+    """Generate a random board state for n queens."""
+    return random_board(n, rng)
 
-def generate_random_board():
-    """Generate a random board state for 8 queens."""
-    return [random.randint(0, 7) for _ in range(8)]
+def random_neighbor_move(board, rng=random):
+    """Pick a random (column, row) move that changes the position of one queen."""
+    n = len(board)
+    # One draw over the n * (n - 1) moves, skipping the queen's current row
+    index = next(int_stream(rng, n * (n - 1)))
+    column, row = divmod(index, n - 1)
+    if row >= board[column]:
+        row += 1
+    return column, row
 
-def random_board_neighbor(board):
+def random_board_neighbor(board, rng=random):
     """Generate a random neighbor by changing the position of one queen."""
-    column = random.randint(0, 7)  # Random column
-    row = random.randint(0, 7)  # Random row
-    while board[column] == row:
-        row = random.randint(0, 7)  # Ensure the new row is different
-    
+    column, row = random_neighbor_move(board, rng)
     new_board = list(board)
     new_board[column] = row
     return new_board
 
-def random_walk_hill_climb(board, max_no_improvement_steps, sideways_limit):
-    """Perform Random-Walk Hill Climbing with sideways moves."""
-    current_board = board
-    current_safe_pairs = count_safe_queen_pairs(current_board)
+def random_walk_hill_climb(board, max_no_improvement_steps, sideways_limit, deadline=None, memory=None, instrument=None,
+                           rng=random):
+    """Perform Random-Walk Hill Climbing with sideways moves.
+
+    If `deadline` expires first, the best board seen is returned. Passing a
+    `transposition.WalkMemory` avoids re-entering recently visited boards.
+    Each step is reported to `instrument` if given.
+    """
+    evaluator = BoardEvaluator(board)
+    moves = int_stream(rng, evaluator.neighbor_count())
+    if memory is not None:
+        memory.start(evaluator)
+    if instrument is not None:
+        instrument.start_run('random_board_neighbor_walk', evaluator.safe_pairs)
+    current_safe_pairs = evaluator.safe_pairs
+    best_safe_pairs = current_safe_pairs
+    best_key = evaluator.key
     total_steps = 0
     sideways_steps = 0
     
     while total_steps < max_no_improvement_steps:
         total_steps += 1
         
-        # Generate a random neighbor and evaluate it
-        neighbor_board = random_board_neighbor(current_board)
-        neighbor_safe_pairs = count_safe_queen_pairs(neighbor_board)
+        # Generate a random neighbor move and evaluate it incrementally
+        if memory is None:
+            # Accept the neighbor even if it's not an improvement (random walk)
+            current_safe_pairs = evaluator.apply_move_at(next(moves))
+        else:
+            current_safe_pairs = memory.step(evaluator, rng)
+        if instrument is not None:
+            instrument.move(current_safe_pairs)
         
-        # Accept the neighbor even if it's not an improvement (random walk)
-        current_board = neighbor_board
-        current_safe_pairs = neighbor_safe_pairs
-        
-        if current_safe_pairs == 28:  # Solution found
-            return current_board, current_safe_pairs, total_steps, sideways_steps
+        if current_safe_pairs == evaluator.max_pairs:  # Solution found
+            if instrument is not None:
+                instrument.end_run(True)
+            return evaluator.board, current_safe_pairs, total_steps, sideways_steps
         
+        if current_safe_pairs > best_safe_pairs:
+            best_safe_pairs = current_safe_pairs
+            best_key = evaluator.key
+        if deadline is not None and deadline.expired(total_steps):
+            if instrument is not None:
+                instrument.end_run(False)
+            return unpack_board(best_key, evaluator.n), best_safe_pairs, total_steps, sideways_steps
+
         sideways_steps += 1
         if sideways_steps >= sideways_limit:
             break
 
     # Return the state even if not optimal (stuck)
-    return current_board, current_safe_pairs, total_steps, sideways_steps
+    if instrument is not None:
+        instrument.end_run(False)
+    return evaluator.board, current_safe_pairs, total_steps, sideways_steps
+
+def simulate_random_walk(num_trials, max_no_improvement_steps, sideways_limit, n=8, batch=False, precision=None,
+                         instrument=None, exact=False, seed=None, walk_memory=False):
+    """Run Random-Walk Hill Climbing simulations and return results.
+
+    With `batch=True` all trials advance in lockstep as NumPy arrays. With a
+    `sequential_stopping.PrecisionTarget` as `precision`, trials stop once
+    the target is met and the final intervals are appended to the results.
+    Every walk is reported to `instrument` if one is given. With
+    `exact=True` the results are computed exactly from the walk's Markov
+    chain (see `markov_analysis`) instead of sampled from `num_trials`.
+    A `seed` gives every trial its own replayable stream from
+    `parallel_trials.trial_rng`. With `walk_memory=True` every walk gets a
+    fresh `transposition.WalkMemory` with a transposition table and a tabu
+    list.
+    """
+    if (precision is not None or instrument is not None or walk_memory) and (batch or exact):
+        raise ValueError("precision, instrument and walk_memory are only supported for sampled serial runs")
+    if exact:
+        from markov_analysis import exact_random_walk_results
+        return exact_random_walk_results(max_no_improvement_steps, sideways_limit, n)
+    if batch:
+        from batch_simulator import simulate_random_walk_batch
+        return simulate_random_walk_batch(num_trials, max_no_improvement_steps, sideways_limit, n)
 
-def simulate_random_walk(num_trials, max_no_improvement_steps, sideways_limit):
-    """Run Random-Walk Hill Climbing simulations and return results."""
     successes = 0
     total_success_steps = 0
     total_stuck_steps = 0
     total_success_sideways = 0
     total_stuck_sideways = 0
     stuck_cases = 0
+    if precision is not None:
+        from sequential_stopping import SequentialTest
+        test = SequentialTest(precision, num_trials)
+        metrics = TrialMetrics()
+    
+    if walk_memory:
+        from transposition import TabuList, TranspositionTable, WalkMemory
     
-    for _ in range(num_trials):
+    for trial in range(num_trials):
+        rng = random if seed is None else trial_rng(seed, trial)
+        memory = WalkMemory(TranspositionTable(), TabuList()) if walk_memory else None
         final_board, final_safe_pairs, steps, sideways_steps = random_walk_hill_climb(
-            generate_random_board(), max_no_improvement_steps, sideways_limit
+            generate_random_board(n, rng), max_no_improvement_steps, sideways_limit, memory=memory,
+            instrument=instrument, rng=rng
         )
         
-        if final_safe_pairs == 28:  # Success
+        if final_safe_pairs == n * (n - 1) // 2:  # Success
             successes += 1
             total_success_steps += steps
             total_success_sideways += sideways_steps
@@ -79,7 +141,13 @@ def simulate_random_walk(num_trials, max_no_improvement_steps, sideways_limit):
             total_stuck_steps += steps
             total_stuck_sideways += sideways_steps
 
+        if precision is not None:
+            metrics.add(final_safe_pairs == n * (n - 1) // 2, steps, sideways_steps)
+            if metrics.trials >= test.next_look and test.update(metrics):
+                break
+
     # Calculate success rate, average steps, and sideways moves
+    num_trials = successes + stuck_cases
     success_rate = (successes / num_trials) * 100
     stuck_rate = (stuck_cases / num_trials) * 100
 
@@ -89,32 +157,56 @@ def simulate_random_walk(num_trials, max_no_improvement_steps, sideways_limit):
     avg_success_sideways = total_success_sideways / successes if successes > 0 else 0
     avg_stuck_sideways = total_stuck_sideways / stuck_cases if stuck_cases > 0 else 0
     
-    return [
+    results = [
         success_rate, stuck_rate, 
         avg_success_steps, avg_stuck_steps, 
         avg_success_sideways, avg_stuck_sideways
     ]
+    if precision is not None:
+        results.append(test.intervals)
+    return results
 
-# Parameters
-num_trials = 1000
-max_no_improvement_steps = 200
-sideways_limits = 100
-
-# Run Random-Walk Hill Climbing simulation for each limit
-sim_results = []
-for limit in sideways_limits:
-    rwc_results = simulate_random_walk(num_trials, max_no_improvement_steps, limit)
-    sim_results.append([limit] + rwc_results)
-
-# Create a DataFrame to display the results
-random_walk_df = pd.DataFrame(
-    sim_results,
-    columns=[
-        'Sideways Moves Limit', 'Success Rate (%)', 'Stuck Rate (%)', 
-        'Avg Steps (Success)', 'Avg Steps (Stuck)', 
-        'Avg Sideways Moves (Success)', 'Avg Sideways Moves (Stuck)'
-    ]
-)
+def main(num_trials=1000, max_no_improvement_steps=200, sideways_limits=(100,), n=8, batch=False, output='table',
+         precision=None, exact=False, walk_memory=False):
+    """Run Random-Walk Hill Climbing simulation for each sideways limit and print the results.
+
+    With `exact=True` every limit is solved exactly in one pass of the chain.
+    Several limits without `batch` or `precision` share one walk per trial
+    (see `parameter_sweep`) unless `walk_memory` gives every walk a
+    transposition table and tabu list.
+    """
+    sim_results = []
+    all_intervals = []
+    if exact:
+        from markov_analysis import exact_random_walk_table
+        sim_results = [row[1:] for row in exact_random_walk_table([max_no_improvement_steps], sideways_limits, n)]
+        sideways_limits = ()
+    elif len(sideways_limits) > 1 and not batch and precision is None and not walk_memory:
+        from parameter_sweep import random_walk_sweep
+        sim_results = [row[1:] for row in random_walk_sweep(num_trials, [max_no_improvement_steps], sideways_limits, n)]
+        sideways_limits = ()
+    for limit in sideways_limits:
+        rwc_results = simulate_random_walk(num_trials, max_no_improvement_steps, limit, n, batch, precision,
+                                           walk_memory=walk_memory)
+        if precision is not None:
+            all_intervals.append(rwc_results.pop())
+        sim_results.append([limit] + rwc_results)
+
+    # Print the results
+    print_results(
+        sim_results,
+        [
+            'Sideways Moves Limit', 'Success Rate (%)', 'Stuck Rate (%)', 
+            'Avg Steps (Success)', 'Avg Steps (Stuck)', 
+            'Avg Sideways Moves (Success)', 'Avg Sideways Moves (Stuck)'
+        ],
+        output
+    )
+    for limit, intervals in zip(sideways_limits, all_intervals):
+        if output != 'json':
+            print(f"\nSideways Moves Limit {limit}:")
+        print_intervals(intervals, output)
+    return sim_results
 
-# Print the results
-print(random_walk_df.to_string(index=False))
+if __name__ == "__main__":
+    main()
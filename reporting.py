@@ -0,0 +1,26 @@
+import json
+
+
+def print_results(rows, columns, output='table'):
+    """Print result rows as a table, or as one JSON object per row.
+
+    pandas is only imported for table output, so JSON output and importing
+    this module stay cheap.
+    """
+    if output == 'json':
+        for row in rows:
+            print(json.dumps(dict(zip(columns, row))))
+        return
+
+    import pandas as pd
+    print(pd.DataFrame(rows, columns=columns).to_string(index=False))
+
+
+def print_intervals(intervals, output='table'):
+    """Print the confidence intervals from a sequential (`precision`) run."""
+    if output == 'json':
+        print(json.dumps({'intervals': intervals}))
+        return
+
+    from sequential_stopping import format_intervals
+    print(format_intervals(intervals))
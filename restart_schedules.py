@@ -0,0 +1,199 @@
+"""Restart schedules for the restart drivers.
+
+A schedule hands out the step cutoff for each walk of a trial: the walk
+gets that many moves to find a solution before the trial restarts from a
+new random board. Local search run lengths are heavy-tailed, so cutting
+long walks short and restarting usually lowers the expected steps to a
+solution; which cutoffs work best depends on the run-length distribution.
+
+    schedule = make_schedule('luby', 500)
+    schedule.start_trial()
+    cutoff = schedule.next_cutoff()   # None means never restart
+    schedule.observe(steps, solved)
+"""
+from collections import deque
+
+# Cutoff growth per restart for GeometricSchedule.
+GEOMETRIC_GROWTH = 1.5
+# Solved walks AdaptiveSchedule needs before it trusts its estimate, and
+# walks it remembers.
+ADAPTIVE_MIN_SOLVED = 30
+ADAPTIVE_HISTORY = 4096
+# Candidate cutoffs AdaptiveSchedule compares, and how often it refits.
+ADAPTIVE_CANDIDATES = 32
+ADAPTIVE_REFIT_EVERY = 64
+# Every this many walks AdaptiveSchedule uses its Luby cutoff instead, so
+# walks longer than its current cutoff keep being observed.
+ADAPTIVE_EXPLORE_EVERY = 4
+
+
+def luby(index):
+    """Term `index` (from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ..."""
+    while True:
+        bits = index.bit_length()
+        if index == (1 << bits) - 1:
+            return 1 << (bits - 1)
+        index -= (1 << (bits - 1)) - 1
+
+
+class RestartSchedule:
+    """Base schedule: never restart. Subclasses override `cutoff_for`."""
+
+    name = 'none'
+    # True for schedules that learn from the walks of earlier trials, so
+    # their results depend on which trials ran before in the same process.
+    learns = False
+
+    def __init__(self, cutoff=None):
+        self.cutoff = cutoff
+        self.restarts = 0
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.cutoff!r})"
+
+    def start_trial(self):
+        """Begin a new trial; the sequence of cutoffs starts over."""
+        self.restarts = 0
+
+    def next_cutoff(self):
+        """Step cutoff for the next walk of the current trial."""
+        cutoff = self.cutoff_for(self.restarts)
+        self.restarts += 1
+        return cutoff
+
+    def cutoff_for(self, restart):
+        """Cutoff of walk number `restart` (from 0) of a trial."""
+        return None
+
+    def observe(self, steps, solved):
+        """Report how a walk ended."""
+
+
+class FixedSchedule(RestartSchedule):
+    """Restart every `cutoff` steps."""
+
+    name = 'fixed'
+
+    def cutoff_for(self, restart):
+        return max(1, self.cutoff)
+
+
+class GeometricSchedule(RestartSchedule):
+    """Cutoffs `cutoff * growth**k`, so a trial never runs out of long walks."""
+
+    name = 'geometric'
+
+    def __init__(self, cutoff, growth=GEOMETRIC_GROWTH):
+        super().__init__(cutoff)
+        self.growth = growth
+
+    def cutoff_for(self, restart):
+        return max(1, round(self.cutoff * self.growth ** restart))
+
+
+class LubySchedule(RestartSchedule):
+    """Cutoffs `cutoff` times the Luby sequence.
+
+    Within a log factor of the best fixed cutoff for any run-length
+    distribution, without knowing the distribution.
+    """
+
+    name = 'luby'
+
+    def cutoff_for(self, restart):
+        return max(1, self.cutoff * luby(restart + 1))
+
+
+class AdaptiveSchedule(LubySchedule):
+    """Fixed cutoff fitted to the run lengths observed so far.
+
+    Starts out as a Luby schedule. Once enough walks have solved, it uses
+    the cutoff c minimizing the estimated steps per solution,
+
+        sum(min(steps, c)) / count(steps <= c),
+
+    over walks whose own cutoff was at least c, and keeps mixing in Luby
+    cutoffs to observe longer walks. The estimate carries over between
+    trials, so the drivers only run it serially, in one batch: split into
+    shards, checkpoint chunks or sequential batches, each part would start
+    from scratch and rarely see enough solved walks to leave Luby.
+    """
+
+    name = 'adaptive'
+    learns = True
+
+    def __init__(self, cutoff, min_solved=ADAPTIVE_MIN_SOLVED, history=ADAPTIVE_HISTORY):
+        super().__init__(cutoff)
+        self.min_solved = min_solved
+        self.walks = deque(maxlen=history)
+        self.current_cutoff = None
+        self.fitted_cutoff = None
+        self.walks_started = 0
+        self._until_refit = 0
+
+    def next_cutoff(self):
+        cutoff = super().next_cutoff()
+        self.walks_started += 1
+        if self.fitted_cutoff is not None and self.walks_started % ADAPTIVE_EXPLORE_EVERY:
+            cutoff = self.fitted_cutoff
+        self.current_cutoff = cutoff
+        return cutoff
+
+    def observe(self, steps, solved):
+        self.walks.append((self.current_cutoff, steps, solved))
+        self._until_refit -= 1
+        if self._until_refit <= 0:
+            self._until_refit = ADAPTIVE_REFIT_EVERY
+            self.fitted_cutoff = self.fit()
+
+    def fit(self):
+        """Best estimated cutoff, or None until `min_solved` walks have solved."""
+        solved_steps = sorted(steps for _, steps, solved in self.walks if solved)
+        if len(solved_steps) < self.min_solved:
+            return None
+        stride = max(1, len(solved_steps) // ADAPTIVE_CANDIDATES)
+        best_cutoff = None
+        best_cost = None
+        for candidate in solved_steps[stride - 1::stride]:
+            total = 0
+            solutions = 0
+            for cutoff, steps, solved in self.walks:
+                if cutoff is not None and cutoff < candidate:
+                    continue
+                total += min(steps, candidate)
+                solutions += solved and steps <= candidate
+            if solutions and (best_cost is None or total / solutions < best_cost):
+                best_cutoff = candidate
+                best_cost = total / solutions
+        return best_cutoff
+
+
+SCHEDULE_CLASSES = {
+    'none': RestartSchedule,
+    'fixed': FixedSchedule,
+    'geometric': GeometricSchedule,
+    'luby': LubySchedule,
+    'adaptive': AdaptiveSchedule,
+}
+SCHEDULES = tuple(SCHEDULE_CLASSES)
+
+
+def check_serial_schedule(schedule, cutoff, workers=1, *batched):
+    """Raise ValueError if a learning schedule would be split into batches.
+
+    `batched` are the options, such as a checkpoint path or a precision
+    target, that make a driver run its trials in several batches.
+    """
+    if make_schedule(schedule, cutoff).learns and (workers is not None and workers > 1
+                                                   or any(option is not None for option in batched)):
+        raise ValueError("the adaptive schedule learns across trials and needs a serial run without "
+                         "checkpoints, precision or distributed workers")
+
+
+def make_schedule(schedule, cutoff):
+    """Schedule named `schedule` with base cutoff `cutoff`; schedule objects pass through."""
+    if not isinstance(schedule, str):
+        return schedule
+    if schedule not in SCHEDULE_CLASSES:
+        raise ValueError(f"Unknown restart schedule: {schedule!r}")
+    return SCHEDULE_CLASSES[schedule](cutoff)
@@ -1,93 +1,176 @@
 import random
-import time
-import pandas as pd
+
+import kernels
+from deadlines import Deadline
+from parallel_trials import run_trials, trial_rng
+from queens_evaluator import BoardEvaluator, unpack_board
+from random_streams import int_stream, random_board
+from reporting import print_intervals, print_results
+from trial_metrics import TrialMetrics
 
 def safe_queen_pairs(board):
     """Calculate the number of non-attacking pairs of queens."""
-    max_pairs = 28  # Max pairs for 8 queens (n * (n-1) / 2 where n = 8)
-    attack_pairs = 0
-    
-    for i in range(8):
-        for j in range(i + 1, 8):
-            # Check if queens are in the same row or on the same diagonal
-            if board[i] == board[j] or abs(board[i] - board[j]) == abs(i - j):
-                attack_pairs += 1
+    return kernels.count_safe_pairs(board)
 
-    return max_pairs - attack_pairs
 
+def generate_random_board(n=8, rng=random):
+    """Generate a random board state for n queens."""
+    return random_board(n, rng)
 
-def generate_random_board():
-    """Generate a random board state for 8 queens."""
-    return [random.randint(0, 7) for _ in range(8)]
 
+def hill_climbing_with_random_walk(board, step_limit, rng=random, deadline=None, memory=None, instrument=None):
+    """Perform Hill Climbing with Random Walk.
 
-def hill_climbing_with_random_walk(board, step_limit):
-    """Perform Hill Climbing with Random Walk."""
-    current_board = board
-    current_safe_pairs = safe_queen_pairs(current_board)
+    Walks at most `step_limit` moves, stopping sooner if `deadline` expires;
+    an unsolved walk returns the best board it saw. `memory` (a
+    `transposition.WalkMemory`) makes the walk avoid revisiting boards, and
+    `instrument` records each step.
+    """
+    evaluator = BoardEvaluator(board)
+    moves = int_stream(rng, evaluator.neighbor_count())
+    if memory is not None:
+        memory.start(evaluator)
+    if instrument is not None:
+        instrument.start_run('hill_climbing_with_random_walk', evaluator.safe_pairs)
+    best_safe_pairs = evaluator.safe_pairs
+    best_key = evaluator.key
     move_count = 0
     random_steps = 0
     
-    while True:
+    while move_count < step_limit:
         move_count += 1
-        neighbor_boards = []
-        for column in range(8):
-            for row in range(8):
-                if current_board[column] != row:
-                    new_board = list(current_board)
-                    new_board[column] = row
-                    neighbor_boards.append((new_board, safe_queen_pairs(new_board)))
+        # Pick a uniformly random neighbor and score it incrementally
+        if memory is None:
+            current_safe_pairs = evaluator.apply_move_at(next(moves))
+        else:
+            current_safe_pairs = memory.step(evaluator, rng)
+        if instrument is not None:
+            instrument.move(current_safe_pairs)
         
-        board, current_safe_pairs = random.choice(neighbor_boards)
-        
-        if current_safe_pairs == 28:
-            return board, current_safe_pairs, move_count, random_steps
+        if current_safe_pairs == evaluator.max_pairs:
+            if instrument is not None:
+                instrument.end_run(True)
+            return evaluator.board, current_safe_pairs, move_count, random_steps
         
+        if current_safe_pairs > best_safe_pairs:
+            best_safe_pairs = current_safe_pairs
+            best_key = evaluator.key
         random_steps += 1
+        if deadline is not None and deadline.expired(move_count):
+            break
+
+    if instrument is not None:
+        instrument.end_run(False)
+    return unpack_board(best_key, evaluator.n), best_safe_pairs, move_count, random_steps
 
 
-def restart_hill_climb_with_time_limit(restart_count, time_limit_per_try):
-    """Perform Hill Climbing with Random Restarts and Time Limit."""
+def time_limit_trials(start, stop, seed, time_limit_per_try, n=8, token=None, instrument=None):
+    """Run time-limited trials [start, stop) for `parallel_trials.run_trials`.
+
+    'stuck_moves' totals the moves of every try of the unsolved trials.
+    """
     solutions = 0
     total_moves = 0
+    stuck_moves = 0
     retry_attempts = 0
+    metrics = TrialMetrics()
     
-    for _ in range(restart_count):
-        board = generate_random_board()
-        start_time = time.time()
+    for trial in range(start, stop):
+        if token is not None and token.cancelled:
+            break
+        rng = random if seed is None else trial_rng(seed, trial)
+        board = generate_random_board(n, rng)
+        deadline = Deadline(time_limit_per_try, token=token)
         move_count = 0
-        while time.time() - start_time < time_limit_per_try:
-            final_board, final_safe_pairs, move_count, _ = hill_climbing_with_random_walk(board, 1000)  # Set a high max steps limit
-            if final_safe_pairs == 28:
+        trial_moves = 0
+        solved = False
+        if instrument is not None:
+            instrument.start_run('time_limit_trial', safe_queen_pairs(board))
+        while not deadline.check():
+            final_board, final_safe_pairs, move_count, _ = hill_climbing_with_random_walk(board, 1000, rng, deadline,
+                                                                                          instrument=instrument)  # At most 1000 moves per try
+            trial_moves += move_count
+            if final_safe_pairs == n * (n - 1) // 2:
                 solutions += 1
                 total_moves += move_count
+                solved = True
                 break
             else:
                 retry_attempts += 1
+                if instrument is not None:
+                    instrument.count('restarts')
+        if not solved:
+            stuck_moves += trial_moves
+        # Same moves as the averages report: the solving try, or every try.
+        metrics.add(solved, move_count if solved else trial_moves)
+        if instrument is not None:
+            instrument.end_run(solved)
     
-    return solutions, total_moves, retry_attempts, restart_count
-
-# Parameters
-simulation_count = 100
-time_limit_per_try = 60  # in seconds
-
-# Run Hill Climbing with Random Restarts and Time Limit
-time_limit_results = restart_hill_climb_with_time_limit(simulation_count, time_limit_per_try)
-
-# Display results in tabular format
-time_limit_df = pd.DataFrame(
-    [['Hill-Climbing with Time Limit'] + [
-        time_limit_results[0] * 100 / simulation_count,  # Success (%)
-        time_limit_results[2] * 100 / simulation_count,  # Stuck Probability (%)
-        time_limit_results[1] / time_limit_results[0] if time_limit_results[0] > 0 else 0,  # Avg Moves (Successful)
-        time_limit_results[2] / (simulation_count - time_limit_results[0]) if (simulation_count - time_limit_results[0]) > 0 else 0,  # Avg Moves (Stuck)
-        0,  # Avg Random Steps (Successful)
-        0   # Avg Random Steps (Stuck)
-    ]],
-    columns=[
-        'Algorithm', 'Success (%)', 'Stuck Probability (%)', 
-        'Avg Moves (Successful)', 'Avg Moves (Stuck)', 
-        'Avg Random Steps (Successful)', 'Avg Random Steps (Stuck)'
-    ]
-)
-print(time_limit_df.to_string(index=False))
+    return {'solutions': solutions, 'total_moves': total_moves, 'stuck_moves': stuck_moves,
+            'retry_attempts': retry_attempts, 'metrics': metrics}
+
+
+def restart_hill_climb_with_time_limit(restart_count, time_limit_per_try, n=8, workers=1, seed=None, token=None,
+                                       precision=None, instrument=None, checkpoint_path=None, resume=False):
+    """Perform Hill Climbing with Random Restarts and Time Limit.
+
+    Returns (solutions, moves of the solving tries, retries, trials, moves
+    of the unsolved trials), plus the intervals with `precision`. The other
+    options are those of
+    `hill_climb_random_restart.random_restart_hill_climb_fixed_steps`.
+    """
+    if instrument is not None and workers is not None and workers > 1:
+        raise ValueError("instrument is only supported with workers=1")
+    if checkpoint_path is not None and precision is not None:
+        raise ValueError("checkpoint_path cannot be combined with precision")
+    if precision is not None:
+        from sequential_stopping import run_sequential
+        counters, intervals = run_sequential(time_limit_trials, restart_count, precision, workers, seed,
+                                             time_limit_per_try, n, token, instrument)
+        return (counters['solutions'], counters['total_moves'], counters['retry_attempts'], intervals['trials'],
+                counters['stuck_moves'], intervals)
+    if checkpoint_path is not None:
+        from checkpoints import run_checkpointed
+        counters = run_checkpointed(time_limit_trials, restart_count, checkpoint_path, workers, seed, time_limit_per_try,
+                                    n, token, instrument, params=(time_limit_per_try, n), resume=resume, token=token)
+    else:
+        counters = run_trials(time_limit_trials, restart_count, workers, seed, time_limit_per_try, n, token,
+                              instrument)
+    return (counters['solutions'], counters['total_moves'], counters['retry_attempts'], restart_count,
+            counters['stuck_moves'])
+
+def main(simulation_count=100, time_limit_per_try=60, n=8, workers=1, seed=None, output='table', precision=None,
+         checkpoint_path=None, resume=False):
+    """Run Hill Climbing with Random Restarts and Time Limit and print the results.
+
+    `time_limit_per_try` is in seconds.
+    """
+    time_limit_results = restart_hill_climb_with_time_limit(simulation_count, time_limit_per_try, n, workers, seed,
+                                                            precision=precision, checkpoint_path=checkpoint_path,
+                                                            resume=resume)
+    simulation_count = time_limit_results[3]
+
+    # Display results in tabular format
+    print_results(
+        [['Hill-Climbing with Time Limit'] + [
+            time_limit_results[0] * 100 / simulation_count,  # Success (%)
+            (simulation_count - time_limit_results[0]) * 100 / simulation_count,  # Stuck Probability (%)
+            time_limit_results[1] / time_limit_results[0] if time_limit_results[0] > 0 else 0,  # Avg Moves (Successful)
+            time_limit_results[4] / (simulation_count - time_limit_results[0]) if (simulation_count - time_limit_results[0]) > 0 else 0,  # Avg Moves (Stuck)
+            0,  # Avg Random Steps (Successful)
+            0   # Avg Random Steps (Stuck)
+        ]],
+        [
+            'Algorithm', 'Success (%)', 'Stuck Probability (%)', 
+            'Avg Moves (Successful)', 'Avg Moves (Stuck)', 
+            'Avg Random Steps (Successful)', 'Avg Random Steps (Stuck)'
+        ],
+        output
+    )
+    if precision is not None:
+        print_intervals(time_limit_results[5], output)
+    return time_limit_results
+
+
+if __name__ == "__main__":
+    main()
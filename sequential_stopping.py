@@ -0,0 +1,139 @@
+import random
+from statistics import NormalDist
+
+from parallel_trials import merge_counters, run_trial_range
+
+# Trials before the first look, and the factor by which the trial count
+# grows between looks. Geometric looks keep the number of checks (and so
+# the widening of each interval) logarithmic in the number of trials.
+MIN_TRIALS = 100
+LOOK_GROWTH = 1.5
+
+
+def z_value(confidence):
+    """Two-sided standard normal quantile for a confidence level."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes, trials, z):
+    """Wilson score interval for a success rate; (0, 1) without trials."""
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    half_width = z * ((rate * (1 - rate) + z * z / (4 * trials)) / trials) ** 0.5 / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def mean_interval(stats, z):
+    """Normal-approximation interval for the mean of a `RunningStats`.
+
+    The mean and stdev come from the exact sums, so the interval does not
+    depend on how the trials were sharded.
+    """
+    if stats.count < 2:
+        return float('-inf'), float('inf')
+    half_width = z * stats.stdev / stats.count ** 0.5
+    return stats.mean - half_width, stats.mean + half_width
+
+
+class PrecisionTarget:
+    """How precise a sequential run must be before it stops.
+
+    `success_rate_width` is the allowed half-width of the success-rate
+    interval in absolute terms (0.005 is +/-0.5 percentage points) and
+    `steps_relative_width` the half-width of the mean-steps interval
+    relative to the mean (0.005 is +/-0.5%). Either may be None to ignore
+    that estimate. `confidence` holds jointly over every look of a run.
+    """
+
+    def __init__(self, success_rate_width=0.005, steps_relative_width=0.005, confidence=0.95, min_trials=MIN_TRIALS,
+                 look_growth=LOOK_GROWTH):
+        self.success_rate_width = success_rate_width
+        self.steps_relative_width = steps_relative_width
+        self.confidence = confidence
+        self.min_trials = min_trials
+        self.look_growth = look_growth
+
+    def look_z(self, look):
+        """z for the 1-based `look`, spending alpha / (look * (look + 1)) on it.
+
+        These shares sum to alpha over all looks, so intervals reported at
+        whichever look stops the run keep the nominal joint confidence.
+        """
+        alpha = 1 - self.confidence
+        return z_value(1 - alpha / (look * (look + 1)))
+
+    def intervals(self, metrics, look):
+        """Estimates and intervals for a `TrialMetrics` at the given look."""
+        z = self.look_z(look)
+        low, high = wilson_interval(metrics.successes, metrics.trials, z)
+        steps_low, steps_high = mean_interval(metrics.steps, z)
+        converged = True
+        if self.success_rate_width is not None:
+            converged = (high - low) / 2 <= self.success_rate_width
+        if self.steps_relative_width is not None:
+            converged = converged and (steps_high - steps_low) / 2 <= self.steps_relative_width * metrics.steps.mean
+        return {
+            'trials': metrics.trials,
+            'confidence': self.confidence,
+            'success_rate': (metrics.success_rate, low, high),
+            'mean_steps': (metrics.steps.mean, steps_low, steps_high),
+            'converged': converged,
+        }
+
+
+class SequentialTest:
+    """Decide after each look whether a run of up to `max_trials` can stop.
+
+    Drivers add trials to a `TrialMetrics` and call `update` whenever
+    `metrics.trials` reaches `next_look`; `intervals` then holds the latest
+    estimates.
+    """
+
+    def __init__(self, target, max_trials):
+        self.target = target
+        self.max_trials = max_trials
+        self.look = 0
+        self.next_look = min(target.min_trials, max_trials)
+        self.intervals = None
+
+    def update(self, metrics):
+        """Take a look; returns True once the target precision is met."""
+        self.look += 1
+        self.intervals = self.target.intervals(metrics, self.look)
+        self.next_look = min(self.max_trials, max(metrics.trials + 1, int(metrics.trials * self.target.look_growth)))
+        return self.intervals['converged']
+
+
+def run_sequential(trial_fn, max_trials, target, workers=1, seed=None, *args):
+    """Run `trial_fn` in growing batches until `target` is met.
+
+    `trial_fn` has the `parallel_trials.run_trials` signature and must
+    return its `TrialMetrics` under 'metrics'. Returns the merged counters
+    and the intervals from the last look. Seeded runs stop at the same trial
+    count, with the same intervals, for any number of workers.
+    """
+    if workers is not None and workers > 1 and seed is None:
+        seed = random.getrandbits(64)
+    test = SequentialTest(target, max_trials)
+    counters = None
+    done = 0
+    while done < max_trials:
+        batch = run_trial_range(trial_fn, done, test.next_look, workers, seed, *args)
+        counters = batch if counters is None else merge_counters([counters, batch])
+        done = test.next_look
+        if test.update(counters['metrics']):
+            break
+    return counters, test.intervals
+
+
+def format_intervals(intervals):
+    """One-line summary of the intervals from a sequential run."""
+    rate, low, high = intervals['success_rate']
+    steps, steps_low, steps_high = intervals['mean_steps']
+    status = "converged" if intervals['converged'] else "target not met"
+    return (f"After {intervals['trials']} trials ({status}, {intervals['confidence']:.0%} confidence): "
+            f"success rate {rate:.2%} [{low:.2%}, {high:.2%}], "
+            f"mean steps {steps:.1f} [{steps_low:.1f}, {steps_high:.1f}]")
@@ -0,0 +1,353 @@
+"""Local solve service: JSON lines over TCP, backed by a process pool.
+
+Each request is one JSON object per line and gets one JSON line back,
+echoing its 'id':
+
+    {"id": 1, "op": "solve", "board": [0, 0, 0, 0, 0, 0, 0, 0], "strategy": "random_walk", "time_limit": 1}
+    {"id": 2, "op": "trials", "driver": "restart", "params": {"num_trials": 100, "seed": 7}}
+
+Concurrent solve requests are coalesced into batches that are split evenly
+across the workers, and results are cached by canonical board so repeated
+starts return at once.
+Run with `python solve_service.py --port 8765` or `queens_cli.py serve`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from parallel_trials import shard_ranges
+from queens_evaluator import canonical_board, pack_board, transform_board
+
+# Solve requests coalesced into one batch, which is split across the workers,
+# and how long the first request of a batch waits for others to join it.
+BATCH_SIZE = 64
+BATCH_WAIT = 0.002
+# Results kept in the LRU cache.
+CACHE_SIZE = 100000
+# Moves without improvement before the random walk counts a local minimum;
+# only affects its statistics, as in the restart scripts.
+WALK_NO_IMPROVEMENT_STEPS = 750
+# Step budget for requests that give neither max_steps nor time_limit, so a
+# random walk on a board without a solution cannot hold a worker forever.
+DEFAULT_MAX_STEPS = 10 ** 7
+# Strategies whose results are cached by canonical board. Steepest ascent is
+# cached per exact board: its tie-break is not symmetric, so the mapped-back
+# result of a symmetric start could differ from `perform_hill_climb`.
+SYMMETRIC_STRATEGIES = ('random_walk',)
+STRATEGIES = ('hill_climb', 'random_walk')
+
+
+def solve_batch(boards, strategy, max_steps=None, time_limit=None, seed=None):
+    """Solve each board with one strategy; runs inside a worker process.
+
+    Returns one (board, safe_pairs, steps, stopped) tuple per board, where
+    `stopped` is the `Deadline.reason` that ended the climb, if any. Without
+    `max_steps` or `time_limit` each board gets `DEFAULT_MAX_STEPS` steps.
+    """
+    from deadlines import Deadline
+
+    results = []
+    for board in boards:
+        if max_steps is None and time_limit is None:
+            deadline = Deadline(max_steps=DEFAULT_MAX_STEPS)
+        else:
+            deadline = Deadline(time_limit, max_steps)
+        if strategy == 'hill_climb':
+            from n_queens_hill_climbing import perform_hill_climb
+            final_board, safe_pairs, steps = perform_hill_climb(board, deadline)
+        else:
+            from hill_climb_random_restart import random_walk_hill_climb
+            from random_streams import RandomStream
+            rng = RandomStream(f"{seed}:{pack_board(board)}") if seed is not None else random
+            final_board, safe_pairs, steps, _, _, _ = random_walk_hill_climb(board, WALK_NO_IMPROVEMENT_STEPS, rng,
+                                                                             deadline)
+        results.append((list(final_board), safe_pairs, steps, deadline.reason))
+    return results
+
+
+def _hill_climb_trials(num_trials, n=8):
+    from n_queens_hill_climbing import simulate_hill_climbing
+    success_rate, avg_success, avg_stuck, best_board, best_pairs, fewest_steps = simulate_hill_climbing(num_trials, n)
+    return {'success_rate': success_rate, 'avg_steps_success': avg_success, 'avg_steps_stuck': avg_stuck,
+            'best_board': best_board, 'best_safe_pairs': best_pairs, 'fewest_steps': fewest_steps}
+
+
+def _random_walk_trials(num_trials, max_no_improvement_steps=200, sideways_limit=100, n=8):
+    from random_walk_hill_climbing import simulate_random_walk
+    columns = ('success_rate', 'stuck_rate', 'avg_steps_success', 'avg_steps_stuck',
+               'avg_sideways_success', 'avg_sideways_stuck')
+    return dict(zip(columns, simulate_random_walk(num_trials, max_no_improvement_steps, sideways_limit, n)))
+
+
+def _restart_trials(num_trials, max_no_improvement_steps=750, steps_per_restart=500, n=8, seed=None, time_limit=None,
+                    schedule='fixed'):
+    from hill_climb_random_restart import random_restart_hill_climb_fixed_steps
+    results = random_restart_hill_climb_fixed_steps(num_trials, max_no_improvement_steps, steps_per_restart, n,
+                                                    seed=seed, keep_steps=False, time_limit=time_limit,
+                                                    schedule=schedule)
+    results.pop('steps_list')
+    results['metrics'] = results['metrics'].summary()
+    return results
+
+
+def _time_limit_trials(num_trials, time_limit_per_try=60, n=8, seed=None):
+    from safe_queen_pairs import restart_hill_climb_with_time_limit
+    solutions, total_moves, retry_attempts, trials, stuck_moves = restart_hill_climb_with_time_limit(
+        num_trials, time_limit_per_try, n, seed=seed)
+    return {'solutions': solutions, 'total_moves': total_moves, 'retry_attempts': retry_attempts, 'trials': trials,
+            'stuck_moves': stuck_moves}
+
+
+TRIAL_DRIVERS = {
+    'hill_climb': _hill_climb_trials,
+    'random_walk': _random_walk_trials,
+    'restart': _restart_trials,
+    'time_limit': _time_limit_trials,
+}
+
+
+def run_trials_request(driver, params):
+    """Run one 'trials' request inside a worker process."""
+    if driver not in TRIAL_DRIVERS:
+        raise ValueError(f"Unknown driver: {driver!r}")
+    return TRIAL_DRIVERS[driver](**params)
+
+
+class SolveService:
+    """Batching, caching front end to a pool of climber processes.
+
+    `solve` and `trials` can be awaited directly from asyncio code; `start`
+    additionally serves them over TCP.
+    """
+
+    def __init__(self, workers=None, batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT, cache_size=CACHE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.queue = asyncio.Queue()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'batches': 0, 'boards_solved': 0, 'pool_restarts': 0}
+        self.server = None
+        self._batcher = None
+
+    async def solve(self, board, strategy='hill_climb', max_steps=None, time_limit=None, seed=None):
+        """Solve one start board; returns a dict with the final board and stats."""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy!r}")
+        n = len(board)
+        if n < 1 or any(not isinstance(row, int) or not 0 <= row < n for row in board):
+            raise ValueError("board must list one row in range(n) per column")
+        if n in (2, 3):
+            raise ValueError(f"{n} queens have no solution")
+        if self._batcher is None:
+            self._batcher = asyncio.create_task(self._run_batches())
+
+        self.stats['requests'] += 1
+        if strategy in SYMMETRIC_STRATEGIES:
+            canonical, symmetry = canonical_board(board)
+        else:
+            canonical, symmetry = list(board), (False, False)
+        key = (strategy, max_steps, time_limit, seed, n, pack_board(canonical))
+
+        result = self.cache.get(key)
+        cached = result is not None
+        if cached:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+        else:
+            future = self.pending.get(key)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                self.pending[key] = future
+                self.queue.put_nowait((key, canonical))
+            # Shielded so one cancelled caller does not cancel the others
+            # waiting on the same board.
+            result = await asyncio.shield(future)
+
+        final_board, safe_pairs, steps, _ = result
+        return {
+            'board': transform_board(final_board, symmetry),
+            'safe_pairs': safe_pairs,
+            'steps': steps,
+            'solved': safe_pairs == n * (n - 1) // 2,
+            'cached': cached,
+        }
+
+    async def trials(self, driver, params):
+        """Run a whole experiment in one worker and return its results."""
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await loop.run_in_executor(executor, run_trials_request, driver, params)
+        except BrokenProcessPool:
+            self._restart_pool(executor)
+            raise
+
+    def _restart_pool(self, broken):
+        """Replace the pool after a worker died, unless that was done already."""
+        if self.executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            self.stats['pool_restarts'] += 1
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            batch_deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = batch_deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups = {}
+            for key, board in batch:
+                groups.setdefault(key[:4], []).append((key, board))
+            for (strategy, max_steps, time_limit, seed), items in groups.items():
+                # One chunk per worker, so a batch does not run in one process.
+                for start, stop in shard_ranges(len(items), self.workers):
+                    chunk = items[start:stop]
+                    self.stats['batches'] += 1
+                    boards = [board for _, board in chunk]
+                    executor = self.executor
+                    try:
+                        task = loop.run_in_executor(executor, solve_batch, boards, strategy, max_steps, time_limit,
+                                                    seed)
+                    except BrokenProcessPool as error:
+                        self._restart_pool(executor)
+                        task = loop.create_future()
+                        task.set_exception(error)
+                    task.add_done_callback(lambda done, chunk=chunk, strategy=strategy, executor=executor:
+                                           self._finish(done, chunk, strategy, executor))
+
+    def _finish(self, done, items, strategy, executor):
+        error = done.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._restart_pool(executor)
+        for index, (key, _) in enumerate(items):
+            future = self.pending.pop(key)
+            if error is not None:
+                future.set_exception(error)
+                continue
+            result = done.result()[index]
+            self.stats['boards_solved'] += 1
+            future.set_result(result)
+            # Unsolved random walks are not cached, so a retry gets a fresh walk,
+            # and neither are climbs the clock cut short, which depend on timing.
+            final_board, safe_pairs, _, stopped = result
+            n = len(final_board)
+            solved = safe_pairs == n * (n - 1) // 2
+            if (strategy not in SYMMETRIC_STRATEGIES and stopped != 'time') or solved:
+                self.cache[key] = result
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+    async def handle_request(self, request):
+        """Answer one decoded request dict; errors are reported, not raised."""
+        response = {'id': None}
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            response['id'] = request.get('id')
+            op = request.get('op', 'solve')
+            if op == 'solve':
+                response.update(await self.solve(request['board'], request.get('strategy', 'hill_climb'),
+                                                 request.get('max_steps'), request.get('time_limit'),
+                                                 request.get('seed')))
+            elif op == 'trials':
+                response['results'] = await self.trials(request['driver'], request.get('params', {}))
+            elif op == 'stats':
+                response.update(self.stats, cache_size=len(self.cache))
+            else:
+                raise ValueError(f"Unknown op: {op!r}")
+        except Exception as error:
+            response['error'] = f"{type(error).__name__}: {error}"
+        return response
+
+    async def _handle_connection(self, reader, writer):
+        lock = asyncio.Lock()
+
+        async def answer(line):
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                response = {'id': None, 'error': f"Invalid JSON: {error}"}
+            else:
+                response = await self.handle_request(request)
+            async with lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        # Requests on one connection are answered as they finish, so a slow
+        # request does not hold up the ones pipelined behind it.
+        tasks = set()
+        try:
+            async for line in reader:
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self.executor.shutdown(cancel_futures=True)
+
+
+def call(request, host='127.0.0.1', port=8765, timeout=None):
+    """Send one request to a running service and return its response dict."""
+    with socket.create_connection((host, port), timeout=timeout) as connection:
+        connection.sendall(json.dumps(request).encode() + b'\n')
+        connection.shutdown(socket.SHUT_WR)
+        with connection.makefile('rb') as responses:
+            return json.loads(responses.readline())
+
+
+async def serve(host='127.0.0.1', port=8765, workers=None):
+    service = SolveService(workers)
+    server = await service.start(host, port)
+    print(f"Serving on {', '.join(str(sock.getsockname()) for sock in server.sockets)}")
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve n-queens solve requests as JSON lines over TCP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    main()
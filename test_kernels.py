@@ -0,0 +1,9 @@
+import pytest
+
+import kernels
+
+pytest.importorskip('numba')
+
+
+def test_backends_agree_on_fixed_seeds():
+    assert kernels.verify_backends(num_boards=200) == []
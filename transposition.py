@@ -0,0 +1,148 @@
+from collections import OrderedDict, deque
+
+# Default number of packed boards remembered by a TranspositionTable.
+TABLE_CAPACITY = 1 << 16
+# Default number of recent moves kept tabu.
+TABU_TENURE = 10
+# Extra neighbor draws a walk makes to avoid visited or tabu states before
+# it settles for the last draw.
+MAX_REDRAWS = 8
+
+
+class TranspositionTable:
+    """Bounded LRU set of visited boards, keyed by `pack_board` integers."""
+
+    def __init__(self, capacity=TABLE_CAPACITY):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def seen(self, key):
+        """True if `key` was visited recently; counts a hit or a miss."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, key):
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            return
+        entries[key] = None
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0,
+        }
+
+
+class TabuList:
+    """The last `tenure` (col, row) squares queens moved away from.
+
+    Moving a queen back onto such a square is tabu, which stops a walk from
+    undoing its own recent moves.
+    """
+
+    def __init__(self, tenure=TABU_TENURE):
+        self.recent = deque()
+        self.counts = {}
+        self.tenure = tenure
+        self.hits = 0
+        self.misses = 0
+
+    def is_tabu(self, col, row):
+        if (col, row) in self.counts:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, col, row):
+        square = (col, row)
+        self.recent.append(square)
+        self.counts[square] = self.counts.get(square, 0) + 1
+        if len(self.recent) > self.tenure:
+            expired = self.recent.popleft()
+            if self.counts[expired] == 1:
+                del self.counts[expired]
+            else:
+                self.counts[expired] -= 1
+
+    def stats(self):
+        checks = self.hits + self.misses
+        return {'size': len(self.recent), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / checks if checks else 0}
+
+
+class WalkMemory:
+    """Transposition table and tabu list consulted by the random walks.
+
+    Each step draws uniform random neighbors until one leads to a board the
+    table has not seen and is not tabu, up to `max_redraws` extra draws, then
+    takes the last draw anyway. A move that solves the board is always taken.
+    Rejected candidates are still scored with `move_delta`, but only to check
+    whether they would solve the board. Either part may be None.
+    """
+
+    def __init__(self, table=None, tabu=None, max_redraws=MAX_REDRAWS):
+        self.table = table
+        self.tabu = tabu
+        self.max_redraws = max_redraws
+        self.steps = 0
+        self.redraws = 0
+
+    def start(self, evaluator):
+        """Record the start board of a walk."""
+        if self.table is not None:
+            self.table.add(evaluator.key)
+
+    def step(self, evaluator, rng):
+        """Pick and apply one neighbor move; returns the new safe-pair count."""
+        board = evaluator.board
+        current_key = evaluator.key
+        powers = evaluator.powers
+        neighbor_count = evaluator.neighbor_count()
+        table = self.table
+        tabu = self.tabu
+        self.steps += 1
+        for attempt in range(self.max_redraws + 1):
+            col, row = evaluator.move_at(rng.randrange(neighbor_count))
+            key = current_key + (row - board[col]) * powers[col]
+            rejected = ((tabu is not None and tabu.is_tabu(col, row))
+                        or (table is not None and table.seen(key)))
+            if not rejected or evaluator.move_delta(col, row) + evaluator.safe_pairs == evaluator.max_pairs:
+                break
+            if attempt < self.max_redraws:
+                self.redraws += 1
+
+        old_row = board[col]
+        safe_pairs = evaluator.apply_move(col, row)
+        if tabu is not None:
+            tabu.add(col, old_row)
+        if table is not None:
+            table.add(evaluator.key)
+        return safe_pairs
+
+    def stats(self):
+        stats = {'steps': self.steps, 'redraws': self.redraws}
+        if self.table is not None:
+            stats['table'] = self.table.stats()
+        if self.tabu is not None:
+            stats['tabu'] = self.tabu.stats()
+        return stats
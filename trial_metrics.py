@@ -0,0 +1,271 @@
+import csv
+import gzip
+import math
+
+# Histogram buckets per doubling of the value; quantiles read from the
+# histogram are accurate to within about 1 / HISTOGRAM_SUB_BUCKETS relative.
+HISTOGRAM_SUB_BUCKETS = 16
+# Records buffered by TrialRecordWriter before they are flushed to disk.
+RECORD_BATCH_SIZE = 10000
+RECORD_COLUMNS = ('trial', 'solved', 'steps', 'sideways_moves', 'time')
+
+
+class RunningStats:
+    """Constant-memory count, mean, variance, min and max.
+
+    `total` and `squares` are plain sums, exact for integer values, and the
+    mean and the variance of integers are derived from them, so they come
+    out bit-identical however the values were split between merged
+    accumulators. Floats, such as timings, get their variance from
+    Welford's method, which does not cancel the way the sums would.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.squares = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.squares += value * value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        """Fold another accumulator into this one (Chan's parallel update)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.squares += other.squares
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    def _exact(self):
+        return isinstance(self.total, int) and isinstance(self.squares, int)
+
+    @property
+    def mean(self):
+        """Mean of the values; 0 without any."""
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def m2(self):
+        """Sum of squared deviations from the mean."""
+        if self.count and self._exact():
+            return (self.count * self.squares - self.total * self.total) / self.count
+        return self._m2
+
+    @property
+    def variance(self):
+        """Sample variance; 0 with fewer than two values."""
+        if self.count < 2:
+            return 0.0
+        if self._exact():
+            return (self.count * self.squares - self.total * self.total) / (self.count * (self.count - 1))
+        return self._m2 / (self.count - 1)
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'stdev': self.stdev,
+            'min': self.minimum,
+            'max': self.maximum,
+        }
+
+
+class LogHistogram:
+    """Mergeable histogram of non-negative integers with log-spaced buckets.
+
+    Values below HISTOGRAM_SUB_BUCKETS get exact buckets; larger values share
+    buckets whose width grows with the value, so memory stays bounded by the
+    number of doublings while quantiles keep a fixed relative error.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+
+    @staticmethod
+    def bucket_of(value):
+        if value < HISTOGRAM_SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - HISTOGRAM_SUB_BUCKETS.bit_length()
+        return shift * HISTOGRAM_SUB_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def bucket_bounds(bucket):
+        """Smallest and largest value stored in `bucket`."""
+        if bucket < HISTOGRAM_SUB_BUCKETS:
+            return bucket, bucket
+        shift, offset = divmod(bucket, HISTOGRAM_SUB_BUCKETS)
+        shift -= 1
+        low = (offset + HISTOGRAM_SUB_BUCKETS) << shift
+        return low, low + (1 << shift) - 1
+
+    def add(self, value):
+        bucket = self.bucket_of(int(value))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """Approximate q-quantile (midpoint of the bucket holding it)."""
+        if self.count == 0:
+            return 0
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen > rank:
+                low, high = self.bucket_bounds(bucket)
+                return (low + high) / 2
+        low, high = self.bucket_bounds(max(self.buckets))
+        return (low + high) / 2
+
+    def items(self):
+        """(low, high, count) for every non-empty bucket in value order."""
+        return [self.bucket_bounds(bucket) + (self.buckets[bucket],) for bucket in sorted(self.buckets)]
+
+
+class TrialMetrics:
+    """Streaming per-trial statistics for success, steps and sideways moves.
+
+    Memory does not grow with the number of trials, and accumulators from
+    separate shards merge into the same totals as one serial run.
+    """
+
+    def __init__(self):
+        self.trials = 0
+        self.successes = 0
+        self.steps = RunningStats()
+        self.success_steps = RunningStats()
+        self.stuck_steps = RunningStats()
+        self.sideways_moves = RunningStats()
+        self.steps_histogram = LogHistogram()
+
+    def add(self, solved, steps, sideways_moves=0):
+        self.trials += 1
+        self.steps.add(steps)
+        self.sideways_moves.add(sideways_moves)
+        self.steps_histogram.add(steps)
+        if solved:
+            self.successes += 1
+            self.success_steps.add(steps)
+        else:
+            self.stuck_steps.add(steps)
+
+    def merge(self, other):
+        self.trials += other.trials
+        self.successes += other.successes
+        self.steps.merge(other.steps)
+        self.success_steps.merge(other.success_steps)
+        self.stuck_steps.merge(other.stuck_steps)
+        self.sideways_moves.merge(other.sideways_moves)
+        self.steps_histogram.merge(other.steps_histogram)
+        return self
+
+    @property
+    def success_rate(self):
+        return self.successes / self.trials if self.trials else 0
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        return {
+            'trials': self.trials,
+            'successes': self.successes,
+            'success_rate': self.success_rate,
+            'steps': self.steps.summary(),
+            'success_steps': self.success_steps.summary(),
+            'stuck_steps': self.stuck_steps.summary(),
+            'sideways_moves': self.sideways_moves.summary(),
+            'steps_quantiles': {q: self.steps_histogram.quantile(q) for q in quantiles},
+        }
+
+
+class TrialRecordWriter:
+    """Write per-trial records to a columnar file in batches.
+
+    Paths ending in .parquet are written with pyarrow; anything else is
+    written as gzip-compressed CSV. Use as a context manager so the final
+    partial batch is flushed.
+    """
+
+    def __init__(self, path, columns=RECORD_COLUMNS, batch_size=RECORD_BATCH_SIZE):
+        self.path = path
+        self.columns = tuple(columns)
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+        self._parquet_writer = None
+        self._csv_file = None
+        if str(path).endswith('.parquet'):
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("Writing .parquet trial records requires pyarrow") from None
+        else:
+            self._csv_file = gzip.open(path, 'wt', newline='')
+            self._csv_writer = csv.writer(self._csv_file)
+            self._csv_writer.writerow(self.columns)
+
+    def write(self, **record):
+        self.pending.append(tuple(record.get(column) for column in self.columns))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        if self._csv_file is not None:
+            self._csv_writer.writerows(self.pending)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.table({column: list(values) for column, values in zip(self.columns, zip(*self.pending))})
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        self.written += len(self.pending)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        if self._csv_file is not None:
+            self._csv_file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()